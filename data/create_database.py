@@ -62,6 +62,31 @@ def create_database():
         ORDER BY "POLIZA_SUMINISTRO", FECHA
     """)
     
+    # Materialize monthly consumption of domestic meters (what subcounting
+    # detection reads), so it is not re-aggregated from the daily rows on
+    # every run. The source parquet's size/mtime are stored alongside; the
+    # table is ignored once the parquet changes until this script is rerun.
+    print("Creating monthly_consumption table...")
+    con.execute("""
+        CREATE TABLE monthly_consumption AS
+        SELECT
+            cd."POLIZA_SUMINISTRO"::VARCHAR AS meter_id,
+            date_trunc('month', cd.FECHA) AS period,
+            CAST(COALESCE(SUM(cd.CONSUMO_REAL), 0) AS BIGINT) AS consumo
+        FROM consumption_data cd
+        JOIN counter_metadata cm
+            ON cd."POLIZA_SUMINISTRO" = cm."POLIZA_SUMINISTRO"
+        WHERE cm.US_AIGUA_GEST = 'D'
+            AND cd.FECHA IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+    """)
+    stat = parquet_path.stat()
+    con.execute(
+        "CREATE TABLE monthly_consumption_source AS SELECT ? AS parquet_path, ? AS size, ? AS mtime_ns",
+        [abs_parquet, stat.st_size, stat.st_mtime_ns],
+    )
+    
     # Finalize
     con.execute("CHECKPOINT")
     con.close()
@@ -78,11 +103,14 @@ def create_database():
     for view in views['table_name']:
         count = con.execute(f"SELECT COUNT(*) FROM {view}").fetchone()[0]
         print(f"  - {view}: {count:,} rows")
+    count = con.execute("SELECT COUNT(*) FROM monthly_consumption").fetchone()[0]
+    print(f"\nTable created:\n  - monthly_consumption: {count:,} rows")
     
     con.close()
     print(f"\n[OK] Database created: {db_path}")
     print("\nNote: This database uses VIEWS that read from the parquet file.")
-    print("The database file is minimal and should work with any DuckDB version!")
+    print("Only the small monthly_consumption table is stored in the file;")
+    print("rerun this script after replacing the parquet to refresh it.")
 
 if __name__ == "__main__":
     create_database()
@@ -20,8 +20,13 @@ from shapely import wkt
 
 
 def load_risk_data(risk_csv_path: str | Path) -> pd.DataFrame:
-    """Load risk scores from CSV."""
-    df = pd.read_csv(risk_csv_path)
+    """Load risk scores from CSV (or Stage 4's Parquet copy when current)."""
+    risk_csv_path = Path(risk_csv_path)
+    parquet_path = risk_csv_path.with_suffix(".parquet")
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= risk_csv_path.stat().st_mtime:
+        df = pd.read_parquet(parquet_path)
+    else:
+        df = pd.read_csv(risk_csv_path, engine="pyarrow")
     
     # Ensure subcount_percent column exists (even if all zeros)
     if "subcount_percent" not in df.columns:
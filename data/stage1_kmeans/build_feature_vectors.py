@@ -17,6 +17,7 @@ import sys
 from pathlib import Path
 
 import duckdb
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler, StandardScaler, OneHotEncoder
 
@@ -27,6 +28,7 @@ try:
         CURRENT_YEAR,
         compute_physical_features,
         EXCLUDED_COUNTERS,
+        _cached_query,
     )
 except ImportError:
     # When run directly, add parent directory to path
@@ -36,6 +38,7 @@ except ImportError:
         CURRENT_YEAR,
         compute_physical_features,
         EXCLUDED_COUNTERS,
+        _cached_query,
     )
 
 OUTPUT_DIR = Path(__file__).resolve().parent.parent / "stage1_outputs"
@@ -43,11 +46,31 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 OUTPUT_FILE = OUTPUT_DIR / "feature_vectors.csv"
 
 
+def _left_join_on_meter_id(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+    """
+    Left-join ``right`` onto ``left`` by ``meter_id``.
+
+    Both Stage I outputs are sorted by ``meter_id``, so the rows usually line
+    up one-to-one already; in that case the columns are concatenated directly
+    and pandas' hash join is skipped. Otherwise fall back to ``merge``.
+    """
+    if np.array_equal(left["meter_id"].to_numpy(), right["meter_id"].to_numpy()):
+        return pd.concat(
+            [
+                left.reset_index(drop=True),
+                right.drop(columns="meter_id").reset_index(drop=True),
+            ],
+            axis=1,
+        )
+    return left.merge(right, on="meter_id", how="left")
+
+
 def compute_monthly_averages(
     *,
     db_path: str | Path = DEFAULT_DB_PATH,
     start_year: int = 2021,
     end_year: int = 2024,
+    use_cache: bool = True,
 ) -> pd.DataFrame:
     """
     Compute monthly average consumption for each meter (48 months total).
@@ -60,6 +83,10 @@ def compute_monthly_averages(
         First year of data (default: 2021).
     end_year:
         Last year of data (default: 2024).
+    use_cache:
+        If True, reuse the parquet copy of the monthly aggregation stored in
+        ``stage1_outputs/cache`` while the database and its source parquet
+        are unchanged.
 
     Returns
     -------
@@ -98,7 +125,9 @@ def compute_monthly_averages(
         WHERE US_AIGUA_GEST = 'D'
         {exclusion_clause_no_alias}
     """
-    meters_df = con.execute(meters_sql).df()
+    meters_df = _cached_query(
+        con, meters_sql, db_path=path, prefix="meters", use_cache=use_cache
+    )
 
     if meters_df.empty:
         raise ValueError("No domestic meters found.")
@@ -129,39 +158,45 @@ def compute_monthly_averages(
     ORDER BY meter_id, year, month
     """
 
-    monthly_df = con.execute(monthly_sql, [start_year, end_year]).df()
+    monthly_df = _cached_query(
+        con,
+        monthly_sql,
+        [start_year, end_year],
+        db_path=path,
+        prefix="monthly",
+        use_cache=use_cache,
+    )
     con.close()
 
     if monthly_df.empty:
         raise ValueError("No monthly consumption data found for the specified years.")
 
-    # Pivot to wide format: one row per meter, one column per month
-    monthly_df["month_label"] = (
-        monthly_df["year"].astype(str) + "_" + monthly_df["month"].astype(str).str.zfill(2)
+    # Pivot to wide format: one row per meter, one column per month.
+    # Pivot on an integer YYYYMM key to avoid building a string label per row.
+    monthly_df["month_key"] = (
+        monthly_df["year"].to_numpy(np.int32) * 100 + monthly_df["month"].to_numpy(np.int32)
     )
 
     monthly_pivot = monthly_df.pivot_table(
         index="meter_id",
-        columns="month_label",
+        columns="month_key",
         values="avg_consumption",
         fill_value=0.0,  # Fill missing months with 0
     )
 
-    # Ensure we have all 48 months (create missing ones with 0)
-    expected_months = []
-    for year in range(start_year, end_year + 1):
-        for month in range(1, 13):
-            expected_months.append(f"{year}_{month:02d}")
-
-    for month in expected_months:
-        if month not in monthly_pivot.columns:
-            monthly_pivot[month] = 0.0
-
-    # Reorder columns to match expected order
-    monthly_pivot = monthly_pivot[[m for m in expected_months if m in monthly_pivot.columns]]
+    # Ensure we have all 48 months in order (create missing ones with 0)
+    expected_keys = [
+        year * 100 + month
+        for year in range(start_year, end_year + 1)
+        for month in range(1, 13)
+    ]
+    monthly_pivot = monthly_pivot.reindex(columns=expected_keys, fill_value=0.0)
 
     # Rename columns to month_YYYY_MM format
-    monthly_pivot.columns = [f"month_{col}" for col in monthly_pivot.columns]
+    monthly_pivot.columns = [f"month_{key // 100}_{key % 100:02d}" for key in expected_keys]
+
+    # float32 halves the memory of the 48 monthly columns
+    monthly_pivot = monthly_pivot.astype(np.float32)
 
     return monthly_pivot.reset_index()
 
@@ -235,28 +270,31 @@ def build_stage2_feature_vectors(
     # Step 3: Load physical features
     if verbose:
         print("\nStep 3: Loading physical features...")
-    physical_df = compute_physical_features(db_path=db_path, current_year=current_year)
+    physical_df, all_brand_models = compute_physical_features(
+        db_path=db_path, current_year=current_year, return_brand_models=True
+    )
     if verbose:
         print(f"  ✓ Loaded physical features for {len(physical_df):,} meters")
 
     # Step 4: Merge all data
     if verbose:
         print("\nStep 4: Merging data...")
-    # Start with cluster labels (this is our base)
-    merged = cluster_df.copy()
-
-    # Merge monthly averages
-    merged = merged.merge(monthly_df, on="meter_id", how="left")
+    # Start with cluster labels (this is our base) and merge monthly averages
+    merged = _left_join_on_meter_id(cluster_df, monthly_df)
     # Fill missing monthly values with 0
     monthly_cols = [col for col in merged.columns if col.startswith("month_")]
     merged[monthly_cols] = merged[monthly_cols].fillna(0.0)
 
-    # Merge physical features
-    merged = merged.merge(
-        physical_df[["meter_id", "age", "diameter", "canya", "brand_model"]],
-        on="meter_id",
-        how="left",
+    # Merge physical features (float32 numerics, categorical brand_model)
+    physical_subset = physical_df[["meter_id", "age", "diameter", "canya", "brand_model"]].astype(
+        {
+            "age": np.float32,
+            "diameter": np.float32,
+            "canya": np.float32,
+            "brand_model": pd.CategoricalDtype(categories=all_brand_models),
+        }
     )
+    merged = _left_join_on_meter_id(merged, physical_subset)
 
     if verbose:
         print(f"  ✓ Merged data: {len(merged):,} meters")
@@ -280,6 +318,7 @@ def build_stage2_feature_vectors(
         categories=[all_diameters],
         sparse_output=False,
         handle_unknown="ignore",
+        dtype=np.float32,
     )
     diameter_encoded = diameter_encoder.fit_transform(merged[["diameter"]])
     diameter_columns = [f"diameter__{int(d)}" for d in diameter_encoder.categories_[0]]
@@ -288,28 +327,19 @@ def build_stage2_feature_vectors(
     )
 
     # 5d. Brand_model: one-hot encoding
-    # Get all possible brand_model combinations from database
-    path = Path(db_path)
-    con = duckdb.connect(database=str(path), read_only=True)
-    all_brand_models_sql = """
-        SELECT DISTINCT 
-            CONCAT_WS('::', CAST(MARCA_COMP AS VARCHAR), CAST(CODI_MODEL AS VARCHAR)) AS brand_model
-        FROM counter_metadata
-        WHERE US_AIGUA_GEST = 'D'
-        ORDER BY brand_model
-    """
-    all_brand_models_df = con.execute(all_brand_models_sql).df()
-    con.close()
-
-    all_brand_models = sorted(all_brand_models_df["brand_model"].tolist())
+    # All possible brand_model combinations were fetched alongside the physical features.
+    # The block is mostly zeros, so keep it sparse until it is written out.
     brand_encoder = OneHotEncoder(
         categories=[all_brand_models],
-        sparse_output=False,
+        sparse_output=True,
         handle_unknown="ignore",
+        dtype=np.float32,
     )
     brand_encoded = brand_encoder.fit_transform(merged[["brand_model"]])
     brand_columns = [f"brand_model__{cat}" for cat in brand_encoder.categories_[0]]
-    brand_df = pd.DataFrame(brand_encoded, columns=brand_columns, index=merged.index)
+    brand_df = pd.DataFrame.sparse.from_spmatrix(
+        brand_encoded, index=merged.index, columns=brand_columns
+    )
 
     if verbose:
         print(f"  ✓ Age: min-max scaled")
@@ -371,8 +401,17 @@ def build_stage2_feature_vectors(
 if __name__ == "__main__":
     feature_vectors, scalers = build_stage2_feature_vectors(verbose=True)
 
-    # Save to CSV
-    feature_vectors.to_csv(OUTPUT_FILE, index=False)
+    # Densify the sparse one-hot block only for serialisation
+    sparse_columns = [
+        col for col, dtype in feature_vectors.dtypes.items() if isinstance(dtype, pd.SparseDtype)
+    ]
+    feature_vectors[sparse_columns] = feature_vectors[sparse_columns].sparse.to_dense()
+
+    # Save to CSV with DuckDB's parallel writer
+    con = duckdb.connect()
+    con.register("feature_vectors", feature_vectors)
+    con.execute(f"COPY feature_vectors TO '{OUTPUT_FILE.as_posix()}' (HEADER, FORMAT CSV)")
+    con.close()
     print(f"\n✓ Feature vectors saved to: {OUTPUT_FILE}")
     print(f"  Shape: {feature_vectors.shape}")
     print(f"  Columns: {len(feature_vectors.columns)} (1 meter_id + {len(feature_vectors.columns) - 1} features)")
@@ -12,10 +12,14 @@ The feature set contains, per domestic meter:
 
 from __future__ import annotations
 
+import hashlib
+import os
+import re
 from pathlib import Path
 from typing import Iterable, Tuple
 
 import duckdb
+import numpy as np
 import pandas as pd
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import MinMaxScaler, StandardScaler, OneHotEncoder
@@ -27,12 +31,91 @@ NUMERIC_FEATURES = ["age", "diameter", "canya"]
 # Excluded counters
 EXCLUDED_COUNTERS = ["5J526OPLVVS2L47O", "QEPJ3GL36LPH6JMU"]
 
+# Parquet cache for pre-aggregated query results
+CACHE_DIR = Path(__file__).resolve().parents[1] / "stage1_outputs" / "cache"
+
+# Parquet file literals in the view definitions written by create_database.py
+_PARQUET_LITERAL = re.compile(r"""["']([^"']+\.parquet)["']""")
+
+
+def _source_stats(con: duckdb.DuckDBPyConnection) -> list[tuple[str, int, int]]:
+    """
+    Return (path, size, mtime_ns) of every parquet file the database views
+    read from.
+
+    The database only holds views, so replacing the parquet without
+    rerunning ``create_database.py`` leaves the DuckDB file untouched.
+    """
+    view_sql = con.execute(
+        "SELECT sql FROM duckdb_views() WHERE NOT internal"
+    ).fetchall()
+    stats = []
+    for source in sorted({p for (sql,) in view_sql for p in _PARQUET_LITERAL.findall(sql)}):
+        try:
+            stat = Path(source).stat()
+        except OSError:
+            stats.append((source, -1, -1))
+        else:
+            stats.append((source, stat.st_size, stat.st_mtime_ns))
+    return stats
+
+
+def _cached_query(
+    con: duckdb.DuckDBPyConnection,
+    sql: str,
+    params: list | None = None,
+    *,
+    db_path: str | Path,
+    prefix: str,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Run ``sql`` and return the result, reusing a parquet copy when available.
+
+    The file name combines a hash of the SQL text and its parameters with a
+    hash of the size/mtime of the DuckDB file and of the parquet files its
+    views read, so editing the query, rebuilding the database with
+    ``create_database.py`` or replacing the source parquet invalidates
+    previous results. Superseded copies of the same query are deleted when
+    a new one is written.
+    """
+    if not use_cache:
+        return con.execute(sql, params).df()
+
+    db_stat = Path(db_path).stat()
+    query_key = hashlib.sha1(repr((sql, params)).encode()).hexdigest()[:16]
+    source_key = hashlib.sha1(
+        repr((db_stat.st_size, db_stat.st_mtime_ns, _source_stats(con))).encode()
+    ).hexdigest()[:16]
+    cache_path = CACHE_DIR / f"{prefix}_{query_key}_{source_key}.parquet"
+
+    if not cache_path.exists():
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Write next to the target and rename, so an interrupted run never
+        # leaves a truncated parquet under the final name
+        tmp_path = cache_path.with_name(f".{cache_path.stem}.{os.getpid()}.tmp")
+        try:
+            con.execute(
+                f"COPY ({sql}) TO '{tmp_path.as_posix()}' (FORMAT PARQUET, COMPRESSION ZSTD)",
+                params,
+            )
+            os.replace(tmp_path, cache_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        for stale in CACHE_DIR.glob(f"{prefix}_{query_key}_*.parquet"):
+            if stale != cache_path:
+                stale.unlink(missing_ok=True)
+
+    return pd.read_parquet(cache_path)
+
 
 def compute_physical_features(
     *,
     db_path: str | Path = DEFAULT_DB_PATH,
     current_year: int = CURRENT_YEAR,
-) -> pd.DataFrame:
+    return_brand_models: bool = False,
+    use_cache: bool = True,
+) -> pd.DataFrame | Tuple[pd.DataFrame, list[str]]:
     """
     Compute physical features required by Stage I.
 
@@ -42,12 +125,21 @@ def compute_physical_features(
         Path to ``analytics.duckdb`` containing the required views.
     current_year:
         Reference year used to compute meter age. Defaults to 2024.
+    return_brand_models:
+        If True, also return the sorted list of every domestic
+        ``brand_model`` combination (the one-hot categories), fetched on
+        the same connection instead of a second ``duckdb.connect``.
+    use_cache:
+        If True, reuse the parquet copy of the query results stored in
+        ``stage1_outputs/cache`` while the database and its source parquet
+        are unchanged.
 
     Returns
     -------
-    pandas.DataFrame
+    pandas.DataFrame or tuple
         DataFrame indexed by meter id with the columns:
         ``age``, ``diameter``, ``canya``, ``brand_model``.
+        If ``return_brand_models`` is True, ``(df, all_brand_models)``.
     """
 
     path = Path(db_path)
@@ -70,6 +162,11 @@ def compute_physical_features(
         SELECT
             "POLIZA_SUMINISTRO"::VARCHAR AS meter_id,
             CAST(DATA_INST_COMP AS DATE) AS installation_date,
+            -- Fractional years up to 31 Dec of the reference year, clipped at 0
+            CASE
+                WHEN DATA_INST_COMP IS NOT NULL
+                THEN GREATEST(DATE_DIFF('day', CAST(DATA_INST_COMP AS DATE), DATE '{int(current_year)}-12-31'), 0) / 365.25
+            END::DOUBLE AS age,
             CAST(DIAM_COMP AS DOUBLE) AS diameter,
             CAST(MARCA_COMP AS VARCHAR) AS marca_comp,
             CAST(CODI_MODEL AS VARCHAR) AS codi_model
@@ -117,8 +214,9 @@ def compute_physical_features(
     )
     SELECT
         m.meter_id,
-        m.installation_date,
+        m.age,
         m.diameter,
+        COALESCE(md.median_yearly, 0) * m.age AS canya,
         m.marca_comp,
         m.codi_model,
         COALESCE(a.avg_yearly, 0) AS avg_yearly,
@@ -126,23 +224,31 @@ def compute_physical_features(
     FROM metadata m
     LEFT JOIN avg_yearly a USING (meter_id)
     LEFT JOIN median_yearly md USING (meter_id)
+    ORDER BY m.meter_id
     """
 
-    df = con.execute(sql).df()
+    df = _cached_query(con, sql, db_path=path, prefix="physical", use_cache=use_cache)
+
+    all_brand_models: list[str] = []
+    if return_brand_models:
+        all_brand_models_sql = """
+            SELECT DISTINCT
+                CONCAT_WS('::', CAST(MARCA_COMP AS VARCHAR), CAST(CODI_MODEL AS VARCHAR)) AS brand_model
+            FROM counter_metadata
+            WHERE US_AIGUA_GEST = 'D'
+            ORDER BY brand_model
+        """
+        all_brand_models_df = _cached_query(
+            con, all_brand_models_sql, db_path=path, prefix="brand_models", use_cache=use_cache
+        )
+        all_brand_models = sorted(all_brand_models_df["brand_model"].tolist())
     con.close()
 
     if df.empty:
         raise ValueError("No domestic meters found with the specified filter.")
 
-    df["installation_date"] = pd.to_datetime(df["installation_date"], errors="coerce")
-
-    reference_date = pd.Timestamp(year=current_year, month=12, day=31)
-    days_since_install = (reference_date - df["installation_date"]).dt.days
-    df["age"] = (days_since_install / 365.25).clip(lower=0)
     df["diameter"] = df["diameter"].astype(float)
 
-    df["canya"] = df["median_yearly"].fillna(0) * df["age"]
-
     df["marca_comp"] = df["marca_comp"].astype(str).str.strip()
     df["codi_model"] = df["codi_model"].astype(str).str.strip()
     df["brand_model"] = (
@@ -161,6 +267,8 @@ def compute_physical_features(
 
     df = df.loc[:, final_columns]
 
+    if return_brand_models:
+        return df, all_brand_models
     return df
 
 
@@ -180,7 +288,9 @@ def build_stage1_feature_matrix(
         (features_df, fitted_minmax_scaler, fitted_standard_scaler, fitted_onehot_encoder)
     """
 
-    raw_features = compute_physical_features(db_path=db_path, current_year=current_year)
+    raw_features, all_brand_models = compute_physical_features(
+        db_path=db_path, current_year=current_year, return_brand_models=True
+    )
 
     # Min-max scaling for age and diameter
     minmax_scaler = MinMaxScaler()
@@ -203,21 +313,6 @@ def build_stage1_feature_matrix(
     # Combine scaled numeric features
     scaled_df = pd.concat([age_diameter_df, canya_df], axis=1)
 
-    # Get all possible brand_model combinations from database to ensure all 27 are encoded
-    path = Path(db_path)
-    con = duckdb.connect(database=str(path), read_only=True)
-    all_brand_models_sql = """
-        SELECT DISTINCT 
-            CONCAT_WS('::', CAST(MARCA_COMP AS VARCHAR), CAST(CODI_MODEL AS VARCHAR)) AS brand_model
-        FROM counter_metadata
-        WHERE US_AIGUA_GEST = 'D'
-        ORDER BY brand_model
-    """
-    all_brand_models_df = con.execute(all_brand_models_sql).df()
-    con.close()
-    
-    all_brand_models = sorted(all_brand_models_df["brand_model"].tolist())
-    
     # Use explicit categories to ensure all 27 combinations are encoded
     encoder = OneHotEncoder(
         categories=[all_brand_models],
@@ -288,7 +383,8 @@ def perform_stage1_kmeans(
     
     # Extract feature columns (exclude meter_id)
     feature_cols = [col for col in features.columns if col != "meter_id"]
-    X = features[feature_cols].values
+    # Contiguous float32 halves memory traffic and lets KMeans use float32 kernels
+    X = np.ascontiguousarray(features[feature_cols].to_numpy(dtype=np.float32))
     
     # Determine k if not provided
     if k is None:
@@ -299,6 +395,7 @@ def perform_stage1_kmeans(
             random_state=random_state,
             n_init=n_init,
             max_iter=max_iter,
+            feature_matrix=X,
             verbose=verbose,
         )
         k = optimal_k
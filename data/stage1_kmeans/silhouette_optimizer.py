@@ -12,12 +12,57 @@ from typing import Tuple
 
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+from joblib import Parallel, delayed, parallel_config
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.metrics import silhouette_score
 
 from .kmeans_physical import build_stage1_feature_matrix, DEFAULT_DB_PATH
 
 
+def _evaluate_k(
+    X: np.ndarray,
+    k: int,
+    *,
+    random_state: int,
+    n_init: int,
+    max_iter: int,
+) -> dict:
+    """Fit KMeans for a single k and return its silhouette score and fit metrics."""
+    kmeans = KMeans(
+        n_clusters=k,
+        random_state=random_state,
+        n_init=n_init,
+        max_iter=max_iter,
+    )
+    labels = kmeans.fit_predict(X)
+
+    return {
+        "k": k,
+        "silhouette_score": silhouette_score(X, labels),
+        "inertia": kmeans.inertia_,
+        "n_iter": kmeans.n_iter_,
+    }
+
+
+def _find_elbow_k(k_values: list[int], inertias: list[float]) -> int:
+    """
+    Return the elbow of an inertia curve.
+
+    Both axes are rescaled to [0, 1] and the elbow is the k whose point lies
+    furthest from the straight line joining the first and last points.
+    """
+    k = np.asarray(k_values, dtype=float)
+    inertia = np.asarray(inertias, dtype=float)
+    if len(k) < 3 or inertia[0] == inertia[-1]:
+        return int(k_values[0])
+
+    x = (k - k[0]) / (k[-1] - k[0])
+    y = (inertia - inertia[-1]) / (inertia[0] - inertia[-1])
+    # Distance (up to a constant) from each point to the line y = 1 - x
+    distance = np.abs(x + y - 1)
+    return int(k_values[int(np.argmax(distance))])
+
+
 def find_optimal_k(
     *,
     k_range: range | list[int] = range(2, 21),
@@ -25,6 +70,9 @@ def find_optimal_k(
     random_state: int = 42,
     n_init: int = 10,
     max_iter: int = 300,
+    n_jobs: int = -1,
+    elbow_window: int | None = None,
+    feature_matrix: np.ndarray | None = None,
     verbose: bool = True,
 ) -> Tuple[int, dict[int, float], pd.DataFrame]:
     """
@@ -42,6 +90,16 @@ def find_optimal_k(
         Number of KMeans initializations per k.
     max_iter:
         Maximum iterations for KMeans.
+    n_jobs:
+        Number of k values evaluated concurrently with joblib (-1 uses all cores).
+    elbow_window:
+        If set, first run a cheap inertia-only sweep (single-init
+        MiniBatchKMeans) over ``k_range``, locate the elbow, and only compute
+        KMeans + silhouette for k within ``elbow_window`` of it. If None
+        (default), every k in ``k_range`` is scored.
+    feature_matrix:
+        Stage I feature matrix (without ``meter_id``) if the caller already
+        built it; otherwise it is loaded from ``db_path``.
     verbose:
         If True, print progress and results.
 
@@ -53,52 +111,59 @@ def find_optimal_k(
         - scores_dict: dictionary mapping k -> silhouette_score
         - results_df: DataFrame with k, silhouette_score, and other metrics
     """
-    # Load feature matrix
-    if verbose:
-        print("Loading feature matrix...")
-    features, _, _, _ = build_stage1_feature_matrix(db_path=db_path)
+    if feature_matrix is not None:
+        X = feature_matrix
+    else:
+        # Load feature matrix
+        if verbose:
+            print("Loading feature matrix...")
+        features, _, _, _ = build_stage1_feature_matrix(db_path=db_path)
 
-    # Extract feature columns (exclude meter_id)
-    feature_cols = [col for col in features.columns if col != "meter_id"]
-    X = features[feature_cols].values
+        # Extract feature columns (exclude meter_id); same float32 layout as
+        # perform_stage1_kmeans
+        feature_cols = [col for col in features.columns if col != "meter_id"]
+        X = np.ascontiguousarray(features[feature_cols].to_numpy(dtype=np.float32))
 
     if verbose:
         print(f"Feature matrix shape: {X.shape}")
-        print(f"Testing k values: {list(k_range)}")
-        print("-" * 60)
 
-    scores = {}
-    results = []
+    k_values = sorted(k_range)
 
-    for k in k_range:
+    if elbow_window is not None:
+        # Cheap pre-filter: inertia from a single MiniBatchKMeans init per k
+        inertias = [
+            MiniBatchKMeans(n_clusters=k, n_init=1, random_state=random_state).fit(X).inertia_
+            for k in k_values
+        ]
+        elbow_k = _find_elbow_k(k_values, inertias)
+        k_values = [k for k in k_values if abs(k - elbow_k) <= elbow_window]
         if verbose:
-            print(f"Testing k={k}...", end=" ")
-
-        # Fit KMeans
-        kmeans = KMeans(
-            n_clusters=k,
-            random_state=random_state,
-            n_init=n_init,
-            max_iter=max_iter,
-        )
-        labels = kmeans.fit_predict(X)
-
-        # Compute silhouette score
-        score = silhouette_score(X, labels)
-        scores[k] = score
-
-        # Store results
-        results.append(
-            {
-                "k": k,
-                "silhouette_score": score,
-                "inertia": kmeans.inertia_,
-                "n_iter": kmeans.n_iter_,
-            }
+            print(f"Inertia elbow at k={elbow_k}")
+
+    if verbose:
+        print(f"Testing k values: {k_values}")
+        print("-" * 60)
+
+    # Each k is an independent fit, so evaluate them in parallel. Workers get a
+    # single OpenMP/BLAS thread each so nested threading cannot oversubscribe
+    # the cores (n_jobs workers x n_cores threads).
+    with parallel_config(backend="loky", inner_max_num_threads=1):
+        results = Parallel(n_jobs=n_jobs, batch_size=1)(
+            delayed(_evaluate_k)(
+                X,
+                k,
+                random_state=random_state,
+                n_init=n_init,
+                max_iter=max_iter,
+            )
+            for k in k_values
         )
 
+    scores = {}
+    for result in results:
+        scores[result["k"]] = result["silhouette_score"]
         if verbose:
-            print(f"silhouette_score = {score:.4f}")
+            print(f"Testing k={result['k']}... silhouette_score = {result['silhouette_score']:.4f}")
 
     results_df = pd.DataFrame(results)
 
@@ -7,6 +7,7 @@ from .run_stage2 import run_stage2
 from .trainer import (
     EarlyStopping,
     create_data_loaders,
+    create_device_tensors,
     extract_latent_representations,
     train_autoencoder,
 )
@@ -17,5 +18,6 @@ __all__ = [
     "train_autoencoder",
     "extract_latent_representations",
     "create_data_loaders",
+    "create_device_tensors",
     "EarlyStopping",
 ]
@@ -4,11 +4,20 @@ Autoencoder model architecture definition using PyTorch.
 
 from __future__ import annotations
 
+import warnings
+
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
 
+def _jit_script(module: nn.Module) -> torch.jit.ScriptModule:
+    """``torch.jit.script`` without its deprecation warning on recent PyTorch."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return torch.jit.script(module)
+
+
 class Autoencoder(nn.Module):
     """
     Autoencoder for learning latent representations of water meter features.
@@ -52,6 +61,7 @@ class Autoencoder(nn.Module):
         
         self.input_dim = input_dim
         self.latent_dim = latent_dim
+        self.dropout = dropout
         
         # Default hidden dimensions if not provided
         if hidden_dims is None:
@@ -62,7 +72,10 @@ class Autoencoder(nn.Module):
         
         hidden1_dim, hidden2_dim = hidden_dims
         
-        # Encoder layers
+        # Encoder/decoder layers. The Sequential containers define the parameter
+        # layout (state_dict keys encoder.0/3/6, decoder.0/3/6); encode() and
+        # decode() call the Linear layers directly instead of going through
+        # the ReLU/Dropout/Identity modules one by one.
         self.encoder = nn.Sequential(
             nn.Linear(input_dim, hidden1_dim),
             nn.ReLU(),
@@ -84,6 +97,13 @@ class Autoencoder(nn.Module):
             nn.Linear(hidden1_dim, input_dim),
         )
     
+    def _activation(self, h: torch.Tensor) -> torch.Tensor:
+        """ReLU (in place) followed by dropout, which is skipped when disabled."""
+        h = F.relu(h, inplace=True)
+        if self.dropout > 0:
+            h = F.dropout(h, p=self.dropout, training=self.training)
+        return h
+    
     def encode(self, x: torch.Tensor) -> torch.Tensor:
         """
         Encode input features to latent representation.
@@ -98,7 +118,9 @@ class Autoencoder(nn.Module):
         torch.Tensor
             Latent representation Z of shape (batch_size, latent_dim)
         """
-        return self.encoder(x)
+        h = self._activation(self.encoder[0](x))
+        h = self._activation(self.encoder[3](h))
+        return self.encoder[6](h)
     
     def decode(self, z: torch.Tensor) -> torch.Tensor:
         """
@@ -114,7 +136,9 @@ class Autoencoder(nn.Module):
         torch.Tensor
             Reconstructed features of shape (batch_size, input_dim)
         """
-        return self.decoder(z)
+        h = self._activation(self.decoder[0](z))
+        h = self._activation(self.decoder[3](h))
+        return self.decoder[6](h)
     
     def forward(self, x: torch.Tensor) -> tuple[torch.Tensor, torch.Tensor]:
         """
@@ -154,3 +178,31 @@ class Autoencoder(nn.Module):
         with torch.no_grad():
             z = self.encode(x)
         return z
+    
+    def export_encoder(self, compile_mode: str | None = None) -> nn.Module:
+        """
+        Return an inference-only, compiled encoder.
+        
+        The returned module holds only the encoder layers (shared with this
+        model, not copied), so latent extraction never touches the decoder.
+        Call ``.eval()`` on it before use so dropout is disabled.
+        
+        Parameters
+        ----------
+        compile_mode : str | None
+            If given, compile with ``torch.compile(mode=compile_mode)``
+            instead of TorchScript. On CUDA, ``"max-autotune"`` lets Inductor
+            fuse the tiny Linear+ReLU chain into few autotuned Triton kernels
+            (launch overhead dominates these GEMMs). Compilation happens on
+            the first call.
+        
+        Returns
+        -------
+        nn.Module
+            Scripted ``nn.Sequential`` mapping (batch_size, input_dim) to
+            (batch_size, latent_dim)
+        """
+        encoder = nn.Sequential(*self.encoder.children())
+        if compile_mode is not None:
+            return torch.compile(encoder, mode=compile_mode)
+        return _jit_script(encoder)
@@ -4,6 +4,7 @@ Main script to run Stage II: Autoencoder training and latent representation extr
 
 from __future__ import annotations
 
+import importlib.util
 import sys
 from pathlib import Path
 
@@ -13,9 +14,9 @@ import torch
 
 # Handle both direct execution and module import
 try:
-    from .model import Autoencoder
+    from .model import Autoencoder, _jit_script
     from .trainer import (
-        create_data_loaders,
+        create_device_tensors,
         EarlyStopping,
         extract_latent_representations,
         train_autoencoder,
@@ -23,9 +24,9 @@ try:
 except ImportError:
     # When run directly, add parent directory to path
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-    from stage2_autoencoder.model import Autoencoder
+    from stage2_autoencoder.model import Autoencoder, _jit_script
     from stage2_autoencoder.trainer import (
-        create_data_loaders,
+        create_device_tensors,
         EarlyStopping,
         extract_latent_representations,
         train_autoencoder,
@@ -38,6 +39,7 @@ MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
 
 STAGE1_FEATURE_VECTORS = STAGE1_OUTPUT_DIR / "feature_vectors.csv"
 STAGE2_LATENT_OUTPUT = STAGE2_OUTPUT_DIR / "latent_representations.csv"
+STAGE2_LATENT_PARQUET = STAGE2_LATENT_OUTPUT.with_suffix(".parquet")
 MODEL_PATH = MODELS_DIR / "stage2_autoencoder.pth"
 
 # Excluded counters
@@ -48,6 +50,57 @@ STAGE2_OUTPUT_DIR.mkdir(exist_ok=True)
 MODELS_DIR.mkdir(exist_ok=True)
 
 
+def _script_model(model: Autoencoder, verbose: bool = True) -> torch.nn.Module:
+    """
+    Compile the autoencoder with TorchScript, falling back to eager mode.
+    
+    The scripted module shares its parameters with ``model``, so training it
+    also updates ``model``.
+    """
+    try:
+        return _jit_script(model)
+    except Exception as exc:  # pragma: no cover - depends on the PyTorch build
+        if verbose:
+            print(f"  ! TorchScript compilation failed ({exc}); using eager model")
+        return model
+
+
+def _probe_batch_size(
+    model: torch.nn.Module,
+    X_train: torch.Tensor,
+    candidates: tuple[int, ...] = (256, 512, 1024, 2048),
+) -> int | None:
+    """
+    Return the largest of ``candidates`` whose forward+backward fits in CUDA
+    memory.
+    
+    The candidates are capped well below the training set size, so the
+    probe never silently switches training to full-batch (which would need
+    a retuned learning rate). The probe runs under a forked RNG, so it does
+    not consume the dropout random stream used by training.
+    
+    Returns None if not even the smallest candidate fits.
+    """
+    sizes = sorted(bs for bs in candidates if bs < len(X_train))
+    
+    best = None
+    model.train()
+    with torch.random.fork_rng(devices=[X_train.device] if X_train.is_cuda else []):
+        for bs in sizes:
+            try:
+                batch = X_train[:bs]
+                _, x_reconstructed = model(batch)
+                torch.nn.functional.mse_loss(x_reconstructed, batch).backward()
+                best = bs
+            except torch.cuda.OutOfMemoryError:
+                break
+            finally:
+                for p in model.parameters():
+                    p.grad = None
+    torch.cuda.empty_cache()
+    return best
+
+
 def run_stage2(
     feature_vectors_path: str | Path = STAGE1_FEATURE_VECTORS,
     latent_dim: int = 8,
@@ -61,6 +114,12 @@ def run_stage2(
     early_stopping_patience: int = 10,
     device: str | None = None,
     random_seed: int = 42,
+    compile_model: bool = True,
+    autotune_encoder: bool = False,
+    full_batch: bool = False,
+    amp: bool = True,
+    grad_accum_steps: int = 1,
+    auto_batch_size: bool = False,
     verbose: bool = True,
 ) -> tuple[pd.DataFrame, Autoencoder]:
     """
@@ -92,6 +151,30 @@ def run_stage2(
         Device to train on ('cpu', 'cuda', or None for auto-detect)
     random_seed : int
         Random seed for reproducibility
+    compile_model : bool
+        If True, train and encode with a TorchScript-compiled copy of the
+        model (lower per-op dispatch overhead for this small MLP), falling
+        back to eager mode if compilation fails
+    autotune_encoder : bool
+        If True, on CUDA with Triton installed, extract latents with a
+        ``torch.compile(mode="max-autotune")`` encoder. Off by default:
+        Inductor autotuning takes minutes, for a single forward pass that
+        is well under a millisecond.
+    full_batch : bool
+        If True, train with one full-batch step per epoch instead of
+        ``batch_size`` minibatches
+    amp : bool
+        If True, use automatic mixed precision when training on CUDA
+        (no effect on CPU)
+    grad_accum_steps : int
+        Minibatches accumulated per optimizer step (effective batch size is
+        batch_size * grad_accum_steps)
+    auto_batch_size : bool
+        On CUDA, replace ``batch_size`` with the largest of a few modest
+        sizes (256-2048, below the training set size) whose forward+backward
+        fits in device memory. Larger batches mean fewer optimizer steps per
+        epoch, so ``learning_rate`` may need retuning. Ignored on CPU, where
+        ``batch_size`` is used as given.
     verbose : bool
         If True, print progress information
     
@@ -147,28 +230,29 @@ def run_stage2(
     # Separate meter_id from features
     meter_ids = df["meter_id"].values
     feature_columns = [col for col in df.columns if col != "meter_id"]
-    X = df[feature_columns].values
+    # Cast once to contiguous float32; every later tensor is a zero-copy view
+    X = np.ascontiguousarray(df[feature_columns].to_numpy(dtype=np.float32))
     
     input_dim = X.shape[1]
     if verbose:
         print(f"  ✓ Input dimension: {input_dim}")
         print(f"  ✓ Feature columns: {len(feature_columns)}")
     
-    # Step 2: Create data loaders
+    # Step 2: Move train/validation splits to the device once
     if verbose:
-        print("\nStep 2: Creating data loaders...")
+        print("\nStep 2: Preparing train/validation tensors...")
     
-    train_loader, val_loader = create_data_loaders(
+    X_train, X_val = create_device_tensors(
         X,
-        batch_size=batch_size,
         train_ratio=train_ratio,
         shuffle=True,
         random_seed=random_seed,
+        device=device,
     )
     
     if verbose:
-        print(f"  ✓ Training samples: {len(train_loader.dataset):,}")
-        print(f"  ✓ Validation samples: {len(val_loader.dataset):,}")
+        print(f"  ✓ Training samples: {len(X_train):,}")
+        print(f"  ✓ Validation samples: {len(X_val):,}")
         print(f"  ✓ Batch size: {batch_size}")
     
     # Step 3: Initialize model
@@ -190,6 +274,19 @@ def run_stage2(
         print(f"  ✓ Latent dimension: {latent_dim}")
         print(f"  ✓ Total parameters: {sum(p.numel() for p in model.parameters()):,}")
     
+    # Scripted module shares parameters with `model`, which is what gets returned
+    model_to_train = _script_model(model.to(device), verbose=verbose) if compile_model else model
+    
+    # Small MLP: on GPU, throughput is bound by launches, not memory
+    if auto_batch_size and not full_batch and torch.device(device).type == "cuda":
+        probed = _probe_batch_size(model_to_train, X_train)
+        if probed is not None:
+            batch_size = probed
+            if verbose:
+                print(f"  ✓ Auto batch size: {batch_size:,} (probed on {device})")
+        elif verbose:
+            print(f"  ! Batch size probe found no fit; keeping batch size {batch_size:,}")
+    
     # Step 4: Train model
     if verbose:
         print("\nStep 4: Training autoencoder...")
@@ -201,15 +298,19 @@ def run_stage2(
     )
     
     history = train_autoencoder(
-        model=model,
-        train_loader=train_loader,
-        val_loader=val_loader,
+        model=model_to_train,
+        train_loader=X_train,
+        val_loader=X_val,
         num_epochs=num_epochs,
         learning_rate=learning_rate,
         weight_decay=weight_decay,
         device=device,
         early_stopping=early_stopping,
         verbose=verbose,
+        batch_size=batch_size,
+        full_batch=full_batch,
+        amp=amp,
+        grad_accum_steps=grad_accum_steps,
     )
     
     if verbose:
@@ -229,15 +330,28 @@ def run_stage2(
     if verbose:
         print("\nStep 6: Extracting latent representations...")
     
-    # Create data loader for all data (no split)
-    all_dataset = torch.utils.data.TensorDataset(torch.from_numpy(X.astype(np.float32)))
-    all_loader = torch.utils.data.DataLoader(
-        all_dataset,
-        batch_size=batch_size,
-        shuffle=False,
+    # Encode all data (no split) in a single forward pass through an
+    # encoder-only module; the decoder is not needed here. Inductor
+    # autotuning of the tiny MLP is opt-in (autotune_encoder).
+    compile_mode = (
+        "max-autotune"
+        if autotune_encoder
+        and torch.device(device).type == "cuda"
+        and importlib.util.find_spec("triton") is not None
+        else None
     )
-    
-    Z = extract_latent_representations(model, all_loader, device=device)
+    X_all = torch.from_numpy(X)
+    Z = None
+    if compile_model or compile_mode is not None:
+        try:
+            encoder = model.export_encoder(compile_mode=compile_mode).to(device).eval()
+            # torch.compile is lazy: its errors surface on this first call
+            Z = extract_latent_representations(encoder, X_all, device=device)
+        except Exception as exc:  # pragma: no cover - depends on the PyTorch build
+            if verbose:
+                print(f"  ! Encoder compilation failed ({exc}); using eager encoder")
+    if Z is None:
+        Z = extract_latent_representations(model, X_all, device=device)
     
     if verbose:
         print(f"  ✓ Extracted latent vectors: {Z.shape}")
@@ -255,8 +369,16 @@ def run_stage2(
     latent_df.insert(0, "meter_id", meter_ids)
     
     latent_df.to_csv(STAGE2_LATENT_OUTPUT, index=False)
+    # Parquet copy for fast, typed loading in Stage III
+    latent_df.to_parquet(
+        STAGE2_LATENT_PARQUET,
+        index=False,
+        compression="zstd",
+        use_dictionary=False,
+    )
     if verbose:
         print(f"  ✓ Latent representations saved to: {STAGE2_LATENT_OUTPUT}")
+        print(f"  ✓ Parquet copy saved to: {STAGE2_LATENT_PARQUET}")
     
     if verbose:
         print("\n" + "=" * 70)
@@ -264,7 +386,7 @@ def run_stage2(
         print("=" * 70)
         print(f"Output files:")
         print(f"  - Model: {MODEL_PATH}")
-        print(f"  - Latent representations: {STAGE2_LATENT_OUTPUT}")
+        print(f"  - Latent representations: {STAGE2_LATENT_OUTPUT} (+ .parquet)")
     
     return latent_df, model
 
@@ -312,6 +434,11 @@ if __name__ == "__main__":
         default=42,
         help="Random seed for reproducibility (default: 42)",
     )
+    parser.add_argument(
+        "--autotune-encoder",
+        action="store_true",
+        help="On CUDA, extract latents with a torch.compile max-autotune encoder (slow to compile)",
+    )
     
     args = parser.parse_args()
     
@@ -325,6 +452,7 @@ if __name__ == "__main__":
         batch_size=args.batch_size,
         learning_rate=args.learning_rate,
         random_seed=args.random_seed,
+        autotune_encoder=args.autotune_encoder,
         verbose=True,
     )
 
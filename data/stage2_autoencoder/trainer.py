@@ -4,8 +4,10 @@ Autoencoder training loop, validation, and early stopping.
 
 from __future__ import annotations
 
+from contextlib import nullcontext
+from functools import partial
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterator
 
 import numpy as np
 import pandas as pd
@@ -15,6 +17,9 @@ from torch.utils.data import DataLoader, TensorDataset
 
 from .model import Autoencoder
 
+# Upper bound on the validation slab encoded per forward pass
+VAL_CHUNK_BYTES = 16 * 2**20
+
 
 class EarlyStopping:
     """Early stopping to prevent overfitting."""
@@ -64,7 +69,12 @@ class EarlyStopping:
             self.best_loss = val_loss
             self.counter = 0
             if self.restore_best_weights:
-                self.best_weights = model.state_dict().copy()
+                # state_dict() holds references to the live tensors, so snapshot
+                # them (on the CPU, to keep a second copy off the accelerator)
+                self.best_weights = {
+                    name: tensor.detach().cpu().clone()
+                    for name, tensor in model.state_dict().items()
+                }
             return False
         else:
             self.counter += 1
@@ -73,19 +83,65 @@ class EarlyStopping:
     def restore_weights(self, model: nn.Module):
         """Restore best model weights."""
         if self.best_weights is not None:
-            model.load_state_dict(self.best_weights)
+            device = next(model.parameters()).device
+            model.load_state_dict(
+                {name: tensor.to(device) for name, tensor in self.best_weights.items()}
+            )
+
+
+def _iterate_batches(
+    data: DataLoader | torch.Tensor,
+    device: torch.device,
+    batch_size: int,
+    shuffle: bool,
+) -> Iterator[torch.Tensor]:
+    """
+    Yield feature batches on ``device`` from a DataLoader or a preloaded tensor.
+    
+    A preloaded tensor is sliced by (shuffled) index ranges directly, which
+    skips the DataLoader's per-sample fetch and collate.
+    """
+    if isinstance(data, torch.Tensor):
+        n_samples = data.shape[0]
+        order = torch.randperm(n_samples, device=data.device) if shuffle else None
+        for start in range(0, n_samples, batch_size):
+            if order is None:
+                yield data[start:start + batch_size]
+            else:
+                yield data[order[start:start + batch_size]]
+    else:
+        for batch_x in data:
+            yield batch_x[0].to(device, non_blocking=True)  # Get features from DataLoader
+
+
+def _optimizer_step(
+    optimizer: torch.optim.Optimizer,
+    scaler: torch.amp.GradScaler | None,
+) -> None:
+    """Apply the accumulated gradients (through ``scaler`` if given) and clear them."""
+    if scaler is not None:
+        scaler.step(optimizer)
+        scaler.update()
+    else:
+        optimizer.step()
+    optimizer.zero_grad(set_to_none=True)
 
 
 def train_autoencoder(
     model: Autoencoder,
-    train_loader: DataLoader,
-    val_loader: DataLoader | None = None,
+    train_loader: DataLoader | torch.Tensor,
+    val_loader: DataLoader | torch.Tensor | None = None,
     num_epochs: int = 100,
     learning_rate: float = 0.001,
     weight_decay: float = 0.0,
     device: str | torch.device = "cpu",
     early_stopping: EarlyStopping | None = None,
     verbose: bool = True,
+    batch_size: int = 64,
+    full_batch: bool = False,
+    cuda_fast_math: bool = True,
+    amp: bool = False,
+    grad_accum_steps: int = 1,
 ) -> dict:
     """
     Train the autoencoder model.
@@ -94,10 +150,11 @@ def train_autoencoder(
     ----------
     model : Autoencoder
         Autoencoder model to train
-    train_loader : DataLoader
-        Training data loader
-    val_loader : DataLoader | None
-        Validation data loader (optional)
+    train_loader : DataLoader | torch.Tensor
+        Training data loader, or the training features preloaded on the
+        device (see ``create_device_tensors``)
+    val_loader : DataLoader | torch.Tensor | None
+        Validation data loader or preloaded validation features (optional)
     num_epochs : int
         Maximum number of training epochs
     learning_rate : float
@@ -110,21 +167,81 @@ def train_autoencoder(
         Early stopping callback (optional)
     verbose : bool
         If True, print training progress
+    batch_size : int
+        Batch size used when ``train_loader`` is a preloaded tensor
+    full_batch : bool
+        If True, take one optimizer step per epoch over the whole training
+        set (a single large forward/backward instead of a minibatch loop).
+        Suited to small datasets that fit in device memory; usually needs
+        more epochs or a higher learning rate than minibatch training.
+    cuda_fast_math : bool
+        On CUDA devices, enable cuDNN autotuning and TF32 matmuls (much
+        faster GEMMs on Ampere+ for a negligible change in the loss). These
+        are process-wide PyTorch settings; pass False for bit-for-bit
+        reproducible runs.
+    amp : bool
+        On CUDA devices, run forward/backward under automatic mixed precision
+        (bfloat16 where supported, otherwise float16 with gradient scaling).
+        The reconstruction loss is always computed in float32. Ignored on CPU.
+    grad_accum_steps : int
+        Number of minibatches whose gradients are accumulated before each
+        optimizer step (effective batch size = batch_size * grad_accum_steps).
+        A trailing partial group at the end of an epoch is still applied.
     
     Returns
     -------
     dict
         Training history with keys: 'train_loss', 'val_loss' (if validation used)
     """
+    if grad_accum_steps < 1:
+        raise ValueError(f"grad_accum_steps must be >= 1, got {grad_accum_steps}")
+    
     device = torch.device(device)
     model = model.to(device)
     
-    # Loss function: Mean Squared Error (reconstruction error)
-    criterion = nn.MSELoss()
+    if cuda_fast_math and device.type == "cuda":
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.set_float32_matmul_precision("high")
+    
+    if full_batch:
+        if not isinstance(train_loader, torch.Tensor):
+            train_loader = train_loader.dataset.tensors[0]
+        train_loader = train_loader.to(device)
+        batch_size = len(train_loader)
+    
+    # Validation needs no shuffling or gradients: move an in-memory validation
+    # set to the device once and evaluate it in as few forward passes as fit
+    if isinstance(val_loader, DataLoader) and isinstance(val_loader.dataset, TensorDataset):
+        val_loader = val_loader.dataset.tensors[0].to(device)
+    
+    # Mixed precision only pays off (and is only supported well) on CUDA.
+    # Without it, no autocast context or GradScaler is created at all.
+    use_amp = amp and device.type == "cuda"
+    scaler = None
+    if use_amp:
+        amp_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        # bfloat16 has float32's exponent range, so only float16 needs loss scaling
+        if amp_dtype == torch.float16:
+            # torch.amp.GradScaler only exists from PyTorch 2.3 on
+            scaler = (
+                torch.amp.GradScaler("cuda")
+                if hasattr(torch.amp, "GradScaler")
+                else torch.cuda.amp.GradScaler()
+            )
+        autocast = partial(torch.autocast, device_type="cuda", dtype=amp_dtype)
+    else:
+        autocast = nullcontext
+    
+    # Loss function: squared reconstruction error, summed so epoch losses are
+    # exact per-element means (partial batches weighted by their size)
+    criterion = nn.MSELoss(reduction="sum")
     
     # Optimizer: Adam
+    params = list(model.parameters())
     optimizer = torch.optim.Adam(
-        model.parameters(),
+        params,
         lr=learning_rate,
         weight_decay=weight_decay,
     )
@@ -136,49 +253,68 @@ def train_autoencoder(
     
     if verbose:
         print(f"Training on device: {device}")
-        print(f"Model parameters: {sum(p.numel() for p in model.parameters()):,}")
+        print(f"Model parameters: {sum(p.numel() for p in params):,}")
         print(f"Input dimension: {model.input_dim}, Latent dimension: {model.latent_dim}")
         print("-" * 70)
     
     for epoch in range(num_epochs):
         # Training phase
         model.train()
-        train_loss = 0.0
+        # Accumulate on the device; a single .item() sync per epoch
+        train_sse = torch.zeros((), device=device)
+        train_elems = 0
         train_batches = 0
+        optimizer.zero_grad(set_to_none=True)
         
-        for batch_x in train_loader:
-            batch_x = batch_x[0].to(device)  # Get features from DataLoader
-            
+        for batch_x in _iterate_batches(train_loader, device, batch_size, shuffle=not full_batch):
             # Forward pass
-            optimizer.zero_grad()
-            z, x_reconstructed = model(batch_x)
-            loss = criterion(x_reconstructed, batch_x)
-            
-            # Backward pass
-            loss.backward()
-            optimizer.step()
+            with autocast():
+                z, x_reconstructed = model(batch_x)
+            sse = criterion(x_reconstructed.float(), batch_x)
+            # Optimize the per-element mean, as with a mean-reduced MSELoss
+            loss = sse / batch_x.numel()
             
-            train_loss += loss.item()
+            # Backward pass (gradients summed over grad_accum_steps minibatches)
+            loss = loss / grad_accum_steps
+            (scaler.scale(loss) if scaler is not None else loss).backward()
+            train_sse += sse.detach()
+            train_elems += batch_x.numel()
             train_batches += 1
+            
+            if train_batches % grad_accum_steps == 0:
+                _optimizer_step(optimizer, scaler)
+        
+        # Flush the gradients of a trailing partial accumulation group
+        if train_batches % grad_accum_steps != 0:
+            _optimizer_step(optimizer, scaler)
         
-        avg_train_loss = train_loss / train_batches
+        avg_train_loss = train_sse.item() / train_elems
         history['train_loss'].append(avg_train_loss)
         
         # Validation phase
         if val_loader is not None:
             model.eval()
-            val_loss = 0.0
-            val_batches = 0
+            val_sse = torch.zeros((), device=device)
+            val_elems = 0
             
-            with torch.no_grad():
-                for batch_x in val_loader:
-                    batch_x = batch_x[0].to(device)
-                    z, x_reconstructed = model(batch_x)
-                    loss = criterion(x_reconstructed, batch_x)
-                    val_loss += loss.item()
-                    val_batches += 1
+            with torch.inference_mode(), autocast():
+                if isinstance(val_loader, torch.Tensor):
+                    # Preloaded validation set: one forward per slab (usually one)
+                    row_bytes = val_loader[0].numel() * val_loader.element_size()
+                    chunk_rows = max(1, VAL_CHUNK_BYTES // row_bytes)
+                    for start in range(0, len(val_loader), chunk_rows):
+                        batch_x = val_loader[start:start + chunk_rows]
+                        z, x_reconstructed = model(batch_x)
+                        val_sse += criterion(x_reconstructed.float(), batch_x)
+                        val_elems += batch_x.numel()
+                else:
+                    for batch_x in val_loader:
+                        batch_x = batch_x[0].to(device, non_blocking=True)
+                        z, x_reconstructed = model(batch_x)
+                        val_sse += criterion(x_reconstructed.float(), batch_x)
+                        val_elems += batch_x.numel()
             
-            avg_val_loss = val_loss / val_batches
+            avg_val_loss = val_sse.item() / val_elems
             history['val_loss'].append(avg_val_loss)
             
             if verbose and (epoch + 1) % 10 == 0:
@@ -211,8 +347,8 @@ def train_autoencoder(
 
 
 def extract_latent_representations(
-    model: Autoencoder,
-    data_loader: DataLoader,
+    model: Autoencoder | nn.Module,
+    data_loader: DataLoader | torch.Tensor,
     device: str | torch.device = "cpu",
 ) -> np.ndarray:
     """
@@ -220,10 +356,12 @@ def extract_latent_representations(
     
     Parameters
     ----------
-    model : Autoencoder
-        Trained autoencoder model
-    data_loader : DataLoader
-        Data loader containing features
+    model : Autoencoder | nn.Module
+        Trained autoencoder model, or a standalone encoder such as the one
+        returned by ``Autoencoder.export_encoder``
+    data_loader : DataLoader | torch.Tensor
+        Data loader containing features, or the full feature tensor (encoded
+        in a single forward pass)
     device : str | torch.device
         Device to run inference on
     
@@ -236,15 +374,66 @@ def extract_latent_representations(
     model = model.to(device)
     model.eval()
     
-    latent_vectors = []
+    # In eval mode (dropout off) the encoder Sequential is exactly encode(),
+    # and the decoder is never touched
+    encoder = getattr(model, "encoder", model)
     
-    with torch.no_grad():
+    with torch.inference_mode():
+        if isinstance(data_loader, torch.Tensor):
+            return encoder(data_loader.to(device, non_blocking=True)).cpu().numpy()
+        
+        # Copy each batch into a preallocated host buffer (sized from the
+        # first batch). On CUDA the buffer is pinned so device-to-host copies
+        # overlap the next batch's compute.
+        Z = None
+        start = 0
         for batch_x in data_loader:
-            batch_x = batch_x[0].to(device)
-            z = model.encode(batch_x)
-            latent_vectors.append(z.cpu().numpy())
+            batch_x = batch_x[0].to(device, non_blocking=True)
+            z = encoder(batch_x)
+            if Z is None:
+                Z = torch.empty(
+                    (len(data_loader.dataset), z.shape[1]),
+                    dtype=torch.float32,
+                    pin_memory=device.type == "cuda",
+                )
+            Z[start:start + len(z)].copy_(z, non_blocking=True)
+            start += len(z)
+        
+        if device.type == "cuda":
+            torch.cuda.synchronize(device)
     
-    return np.vstack(latent_vectors)
+    return Z.numpy()
+
+
+def _as_float32_array(X: np.ndarray | pd.DataFrame) -> np.ndarray:
+    """Return ``X`` as a C-contiguous float32 array, copying only if needed."""
+    if isinstance(X, pd.DataFrame):
+        X = X.to_numpy(dtype=np.float32)
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+def _split_train_val(
+    X: torch.Tensor,
+    train_ratio: float,
+    shuffle: bool,
+    random_seed: int,
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Split rows of ``X`` into train/validation tensors.
+    
+    When shuffling, a seeded ``torch.randperm`` selects the rows of each split
+    with ``index_select``: one allocation per split, no shuffled copy of the
+    full matrix and no reseeding of NumPy's global RNG.
+    """
+    n_samples = X.shape[0]
+    n_train = int(n_samples * train_ratio)
+    
+    if not shuffle:
+        return X[:n_train], X[n_train:]
+    
+    generator = torch.Generator().manual_seed(random_seed)
+    perm = torch.randperm(n_samples, generator=generator).to(X.device)
+    return X.index_select(0, perm[:n_train]), X.index_select(0, perm[n_train:])
 
 
 def create_data_loaders(
@@ -253,6 +442,10 @@ def create_data_loaders(
     train_ratio: float = 0.8,
     shuffle: bool = True,
     random_seed: int = 42,
+    pin_memory: bool | None = None,
+    num_workers: int = 2,
+    persistent_workers: bool = True,
+    prefetch_factor: int = 2,
 ) -> tuple[DataLoader, DataLoader]:
     """
     Create train and validation data loaders.
@@ -269,44 +462,95 @@ def create_data_loaders(
         Whether to shuffle the data before splitting
     random_seed : int
         Random seed for reproducibility
+    pin_memory : bool | None
+        Whether the loaders return page-locked batches, enabling asynchronous
+        host-to-device copies. If None, pins only when CUDA is available.
+    num_workers : int
+        Number of worker processes used to collate (and pin) batches.
+        0 loads batches in the main process.
+    persistent_workers : bool
+        Keep worker processes alive between epochs instead of re-spawning
+        them on every pass over the loader (only used when num_workers > 0)
+    prefetch_factor : int
+        Batches loaded in advance by each worker (only used when num_workers > 0)
     
     Returns
     -------
     tuple[DataLoader, DataLoader]
         (train_loader, val_loader)
     """
-    if isinstance(X, pd.DataFrame):
-        X = X.values
+    if pin_memory is None:
+        pin_memory = torch.cuda.is_available()
     
-    # Convert to float32
-    X = X.astype(np.float32)
+    X = _as_float32_array(X)
     
     # Split into train and validation
-    n_samples = len(X)
-    n_train = int(n_samples * train_ratio)
-    
-    if shuffle:
-        np.random.seed(random_seed)
-        indices = np.random.permutation(n_samples)
-        X = X[indices]
-    
-    X_train = X[:n_train]
-    X_val = X[n_train:]
+    X_train, X_val = _split_train_val(torch.from_numpy(X), train_ratio, shuffle, random_seed)
     
     # Create datasets
-    train_dataset = TensorDataset(torch.from_numpy(X_train))
-    val_dataset = TensorDataset(torch.from_numpy(X_val))
+    train_dataset = TensorDataset(X_train)
+    val_dataset = TensorDataset(X_val)
+    
+    # Worker options are only valid when batches are loaded in subprocesses
+    worker_kwargs = {"num_workers": num_workers}
+    if num_workers > 0:
+        worker_kwargs["persistent_workers"] = persistent_workers
+        worker_kwargs["prefetch_factor"] = prefetch_factor
     
     # Create data loaders
     train_loader = DataLoader(
         train_dataset,
         batch_size=batch_size,
         shuffle=True,
+        pin_memory=pin_memory,
+        **worker_kwargs,
     )
     val_loader = DataLoader(
         val_dataset,
         batch_size=batch_size,
         shuffle=False,
+        pin_memory=pin_memory,
+        **worker_kwargs,
     )
     
     return train_loader, val_loader
+
+
+def create_device_tensors(
+    X: np.ndarray | pd.DataFrame,
+    train_ratio: float = 0.8,
+    shuffle: bool = True,
+    random_seed: int = 42,
+    device: str | torch.device = "cpu",
+) -> tuple[torch.Tensor, torch.Tensor]:
+    """
+    Split the features and move both splits to the device once.
+    
+    The feature matrix is small enough to live on the device for the whole
+    run, so ``train_autoencoder`` can batch it by index slicing instead of
+    going through a DataLoader (no per-epoch host-to-device copies).
+    
+    Parameters
+    ----------
+    X : np.ndarray | pd.DataFrame
+        Feature matrix of shape (n_samples, n_features)
+    train_ratio : float
+        Proportion of data to use for training (rest for validation)
+    shuffle : bool
+        Whether to shuffle the data before splitting
+    random_seed : int
+        Random seed for reproducibility
+    device : str | torch.device
+        Device to place the tensors on
+    
+    Returns
+    -------
+    tuple[torch.Tensor, torch.Tensor]
+        (X_train, X_val) float32 tensors on ``device``
+    """
+    X = _as_float32_array(X)
+    
+    # Move once, then split on the device
+    X_tensor = torch.from_numpy(X).to(device)
+    
+    return _split_train_val(X_tensor, train_ratio, shuffle, random_seed)
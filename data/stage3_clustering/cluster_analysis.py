@@ -58,9 +58,90 @@ def load_cluster_labels(
     return df
 
 
+def _prepare_merged(
+    cluster_labels: pd.DataFrame,
+    physical_features: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Inner-join cluster labels with physical features on meter_id.
+    
+    Same result as merging on the meter_id column (rows keep the
+    cluster_labels order) but joins on a unique index, which avoids
+    hashing both sides. ``cluster_label`` and ``brand_model`` are returned
+    as categoricals so repeated groupby calls work on integer codes.
+    """
+    merged = cluster_labels.set_index("meter_id").join(
+        physical_features.set_index("meter_id"), how="inner"
+    ).reset_index()
+    for col in ("cluster_label", "brand_model"):
+        if col in merged.columns:
+            merged[col] = merged[col].astype("category")
+    return merged
+
+
+def _count_table(merged: pd.DataFrame, col: str) -> pd.DataFrame:
+    """
+    Cluster x ``col`` contingency table of meter counts.
+    
+    Same table as ``pd.crosstab(merged["cluster_label"], merged[col])`` from a
+    single grouped count, without crosstab's pivot_table machinery.
+    """
+    return merged.groupby(["cluster_label", col], observed=True).size().unstack(fill_value=0)
+
+
+def _modes_from_counts(counts: pd.DataFrame) -> pd.Series:
+    """
+    Per-row mode of a count table, like ``Series.mode().iloc[0]`` per cluster:
+    the most frequent value, the smallest one on ties, None if the row is empty.
+    """
+    has_values = counts.sum(axis=1) > 0
+    modes = counts.idxmax(axis=1)
+    if isinstance(modes.dtype, pd.CategoricalDtype):
+        # Plain values, as when the counted column is not categorical
+        modes = modes.astype(object)
+    return modes.where(has_values, None)
+
+
+def _row_percentages(counts: pd.DataFrame) -> pd.DataFrame:
+    """Normalize each row of a count table to percentages."""
+    return counts.div(counts.sum(axis=1), axis=0) * 100
+
+
+def _cluster_codes(merged: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Factorize ``cluster_label`` once into contiguous codes.
+    
+    Returns (codes, cluster_ids) where ``codes[i]`` indexes the sorted
+    ``cluster_ids``; per-cluster reductions can then use ``np.bincount`` or
+    a sort on ``codes`` instead of scanning ``merged`` once per cluster.
+    """
+    codes, cluster_ids = pd.factorize(merged["cluster_label"], sort=True)
+    return codes, np.asarray(cluster_ids)
+
+
+def _split_by_cluster(
+    merged: pd.DataFrame,
+    col: str,
+    codes: np.ndarray | None = None,
+) -> list[np.ndarray]:
+    """
+    Split ``merged[col]`` into one array per cluster, in cluster order.
+    
+    A stable argsort on the cluster codes followed by ``np.split`` yields the
+    same groups (and within-group order) as iterating
+    ``merged.groupby("cluster_label")``, as views of a single sorted array.
+    """
+    if codes is None:
+        codes, _ = _cluster_codes(merged)
+    order = np.argsort(codes, kind="stable")
+    split_idx = np.flatnonzero(np.diff(codes[order])) + 1
+    return np.split(merged[col].to_numpy()[order], split_idx)
+
+
 def compute_cluster_statistics(
     cluster_labels: pd.DataFrame,
     physical_features: pd.DataFrame,
+    merged: pd.DataFrame | None = None,
 ) -> pd.DataFrame:
     """
     Compute comprehensive statistics for each cluster.
@@ -71,6 +152,9 @@ def compute_cluster_statistics(
         DataFrame with meter_id and cluster_label
     physical_features : pd.DataFrame
         DataFrame with meter_id, age, diameter, canya, brand_model
+    merged : pd.DataFrame, optional
+        Pre-joined labels and features (see ``_prepare_merged``); computed
+        from the two inputs if None
         
     Returns
     -------
@@ -78,72 +162,81 @@ def compute_cluster_statistics(
         Statistics per cluster
     """
     # Merge cluster labels with physical features
-    merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
-    
-    # Group by cluster
-    cluster_stats = []
-    
-    for cluster_id in sorted(merged["cluster_label"].unique()):
-        cluster_data = merged[merged["cluster_label"] == cluster_id]
-        n_meters = len(cluster_data)
-        
-        if n_meters == 0:
+    if merged is None:
+        merged = _prepare_merged(cluster_labels, physical_features)
+    
+    # Cluster sizes plus age and canya statistics in one DuckDB aggregation
+    numeric_aggs = "".join(
+        f""",
+            AVG({col}) AS {col}_mean,
+            MEDIAN({col}) AS {col}_median,
+            STDDEV_SAMP({col}) AS {col}_std,
+            MIN({col}) AS {col}_min,
+            MAX({col}) AS {col}_max"""
+        for col in ("age", "canya")
+        if col in merged.columns
+    )
+    con = duckdb.connect()
+    # Register plain label values: a categorical column would reach DuckDB as
+    # an ENUM and come back as object dtype instead of the labels' own dtype
+    con.register("merged", merged.assign(cluster_label=np.asarray(merged["cluster_label"])))
+    stats_df = con.execute(f"""
+        SELECT
+            cluster_label AS cluster_id,
+            COUNT(*) AS n_meters,
+            100.0 * COUNT(*) / SUM(COUNT(*)) OVER () AS percentage{numeric_aggs}
+        FROM merged
+        GROUP BY cluster_label
+        ORDER BY cluster_label
+    """).df()
+    con.close()
+    
+    grouped = merged.groupby("cluster_label", sort=True, observed=True)
+    n_meters = stats_df.set_index("cluster_id")["n_meters"]
+    
+    # Diameter and brand/model statistics from a single cross-tabulation each
+    for col in ("diameter", "brand_model"):
+        if col not in merged.columns:
             continue
         
-        # Numeric statistics
-        stats_dict = {
-            "cluster_id": cluster_id,
-            "n_meters": n_meters,
-            "percentage": 100 * n_meters / len(merged),
+        counts = _count_table(merged, col).reindex(
+            n_meters.index, fill_value=0
+        )
+        # Value counts per cluster, most frequent first (categoricals also
+        # report unused categories, so drop zero counts)
+        value_counts = grouped[col].value_counts()
+        value_counts = value_counts[value_counts > 0]
+        distribution = {
+            cluster_id: cluster_counts.droplevel(0).to_dict()
+            for cluster_id, cluster_counts in value_counts.groupby(level=0, observed=True)
         }
         
-        # Age statistics
-        if "age" in cluster_data.columns:
-            stats_dict.update({
-                "age_mean": cluster_data["age"].mean(),
-                "age_median": cluster_data["age"].median(),
-                "age_std": cluster_data["age"].std(),
-                "age_min": cluster_data["age"].min(),
-                "age_max": cluster_data["age"].max(),
-            })
-        
-        # Canya statistics
-        if "canya" in cluster_data.columns:
-            stats_dict.update({
-                "canya_mean": cluster_data["canya"].mean(),
-                "canya_median": cluster_data["canya"].median(),
-                "canya_std": cluster_data["canya"].std(),
-                "canya_min": cluster_data["canya"].min(),
-                "canya_max": cluster_data["canya"].max(),
-            })
-        
-        # Diameter statistics
-        if "diameter" in cluster_data.columns:
-            diameter_counts = cluster_data["diameter"].value_counts().to_dict()
-            stats_dict["diameter_mode"] = cluster_data["diameter"].mode().iloc[0] if len(cluster_data["diameter"].mode()) > 0 else None
-            stats_dict["diameter_distribution"] = diameter_counts
-            
-            # Add individual diameter counts
-            for diam, count in diameter_counts.items():
-                stats_dict[f"diameter_{int(diam)}_count"] = count
-                stats_dict[f"diameter_{int(diam)}_pct"] = 100 * count / n_meters
+        stats_df[f"{col}_mode"] = stats_df["cluster_id"].map(_modes_from_counts(counts))
+        stats_df[f"{col}_distribution"] = stats_df["cluster_id"].map(distribution)
         
-        # Brand/Model statistics
-        if "brand_model" in cluster_data.columns:
-            brand_model_counts = cluster_data["brand_model"].value_counts().to_dict()
-            stats_dict["brand_model_mode"] = cluster_data["brand_model"].mode().iloc[0] if len(cluster_data["brand_model"].mode()) > 0 else None
-            stats_dict["brand_model_distribution"] = brand_model_counts
-            
+        if col == "diameter":
+            # Individual diameter counts (NaN where a cluster has none)
+            present = counts.where(counts > 0)
+            pct = present.div(n_meters, axis=0) * 100
+            diameter_cols = {}
+            for diam in counts.columns:
+                diameter_cols[f"diameter_{int(diam)}_count"] = present[diam]
+                diameter_cols[f"diameter_{int(diam)}_pct"] = pct[diam]
+            stats_df = stats_df.join(pd.DataFrame(diameter_cols), on="cluster_id")
+        else:
             # Top 3 brand/models
-            top_brand_models = cluster_data["brand_model"].value_counts().head(3)
-            for i, (bm, count) in enumerate(top_brand_models.items(), 1):
-                stats_dict[f"top_brand_model_{i}"] = bm
-                stats_dict[f"top_brand_model_{i}_count"] = count
-                stats_dict[f"top_brand_model_{i}_pct"] = 100 * count / n_meters
-        
-        cluster_stats.append(stats_dict)
-    
-    stats_df = pd.DataFrame(cluster_stats)
+            top = value_counts.groupby(level=0, observed=True).head(3).reset_index(name="count")
+            # Plain labels/values, so the join below keeps cluster_id's dtype
+            top = top.astype({"cluster_label": n_meters.index.dtype, col: object})
+            top["rank"] = top.groupby("cluster_label", observed=True).cumcount() + 1
+            top["pct"] = 100 * top["count"] / n_meters.reindex(top["cluster_label"]).to_numpy()
+            top = top.set_index(["cluster_label", "rank"]).unstack("rank")
+            top_cols = {}
+            for i in top.columns.get_level_values("rank").unique():
+                top_cols[f"top_brand_model_{i}"] = top[(col, i)]
+                top_cols[f"top_brand_model_{i}_count"] = top[("count", i)]
+                top_cols[f"top_brand_model_{i}_pct"] = top[("pct", i)]
+            stats_df = stats_df.join(pd.DataFrame(top_cols), on="cluster_id")
     
     return stats_df
 
@@ -151,6 +244,7 @@ def compute_cluster_statistics(
 def analyze_cluster_characteristics(
     cluster_labels: pd.DataFrame,
     physical_features: pd.DataFrame,
+    merged: pd.DataFrame | None = None,
 ) -> Dict[str, pd.DataFrame]:
     """
     Perform deep analysis of cluster characteristics.
@@ -161,6 +255,8 @@ def analyze_cluster_characteristics(
         DataFrame with meter_id and cluster_label
     physical_features : pd.DataFrame
         DataFrame with meter_id, age, diameter, canya, brand_model
+    merged : pd.DataFrame, optional
+        Pre-joined labels and features; computed from the two inputs if None
         
     Returns
     -------
@@ -174,12 +270,13 @@ def analyze_cluster_characteristics(
         - 'detailed_stats': Detailed statistics per cluster
     """
     # Merge data
-    merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
+    if merged is None:
+        merged = _prepare_merged(cluster_labels, physical_features)
     
     results = {}
     
     # 1. Overall summary statistics
-    summary = merged.groupby("cluster_label").agg({
+    summary = merged.groupby("cluster_label", observed=True).agg({
         "meter_id": "count",
         "age": ["mean", "median", "std", "min", "max"],
         "canya": ["mean", "median", "std", "min", "max"],
@@ -188,33 +285,34 @@ def analyze_cluster_characteristics(
     summary.columns = ["_".join(col).strip("_") for col in summary.columns.values]
     summary = summary.reset_index()
     
-    # Compute mode separately (pandas groupby doesn't support mode in agg dict)
-    diameter_mode = merged.groupby("cluster_label")["diameter"].apply(lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else None)
-    summary["diameter_mode"] = summary["cluster_label"].map(diameter_mode)
+    # Compute mode separately (pandas groupby doesn't support mode in agg dict),
+    # from the diameter count table that is reused for the distribution below
+    diameter_counts = _count_table(merged, "diameter")
+    summary["diameter_mode"] = summary["cluster_label"].map(_modes_from_counts(diameter_counts))
     
     summary["percentage"] = 100 * summary["meter_id_count"] / len(merged)
     results["summary"] = summary
     
     # 2. Age analysis
-    age_analysis = merged.groupby("cluster_label")["age"].describe().reset_index()
+    age_analysis = merged.groupby("cluster_label", observed=True)["age"].describe().reset_index()
     results["age_analysis"] = age_analysis
     
     # 3. Canya analysis
-    canya_analysis = merged.groupby("cluster_label")["canya"].describe().reset_index()
+    canya_analysis = merged.groupby("cluster_label", observed=True)["canya"].describe().reset_index()
     results["canya_analysis"] = canya_analysis
     
     # 4. Diameter distribution
-    diameter_crosstab = pd.crosstab(merged["cluster_label"], merged["diameter"], normalize="index") * 100
+    diameter_crosstab = _row_percentages(diameter_counts)
     diameter_crosstab = diameter_crosstab.reset_index()
     results["diameter_analysis"] = diameter_crosstab
     
     # 5. Brand/Model distribution
-    brand_model_crosstab = pd.crosstab(merged["cluster_label"], merged["brand_model"], normalize="index") * 100
+    brand_model_crosstab = _row_percentages(_count_table(merged, "brand_model"))
     brand_model_crosstab = brand_model_crosstab.reset_index()
     results["brand_model_analysis"] = brand_model_crosstab
     
     # 6. Detailed statistics
-    detailed_stats = compute_cluster_statistics(cluster_labels, physical_features)
+    detailed_stats = compute_cluster_statistics(cluster_labels, physical_features, merged=merged)
     results["detailed_stats"] = detailed_stats
     
     return results
@@ -225,6 +323,7 @@ def identify_subcounting_patterns(
     physical_features: pd.DataFrame,
     canya_threshold: float | None = None,
     age_threshold: float | None = None,
+    merged: pd.DataFrame | None = None,
 ) -> pd.DataFrame:
     """
     Identify clusters that may indicate subcounting behavior.
@@ -244,13 +343,16 @@ def identify_subcounting_patterns(
         Threshold below which canya is considered suspicious (default: 25th percentile)
     age_threshold : float, optional
         Threshold above which age is considered high (default: 75th percentile)
+    merged : pd.DataFrame, optional
+        Pre-joined labels and features; computed from the two inputs if None
         
     Returns
     -------
     pandas.DataFrame
         Clusters ranked by subcounting risk
     """
-    merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
+    if merged is None:
+        merged = _prepare_merged(cluster_labels, physical_features)
     
     # Set default thresholds based on data distribution
     if canya_threshold is None:
@@ -258,37 +360,41 @@ def identify_subcounting_patterns(
     if age_threshold is None:
         age_threshold = merged["age"].quantile(0.75)
     
-    # Compute risk score per cluster
-    risk_scores = []
+    # Per-cluster reductions as bincounts over contiguous cluster codes
+    # (one vectorized pass each, no per-group Python work)
+    codes, cluster_ids = _cluster_codes(merged)
+    n_clusters = len(cluster_ids)
+    age = merged["age"].to_numpy(dtype=np.float64)
+    canya = merged["canya"].to_numpy(dtype=np.float64)
+    
+    def cluster_mean(values: np.ndarray) -> np.ndarray:
+        # NaN-skipping, like pandas mean
+        valid = ~np.isnan(values)
+        sums = np.bincount(codes[valid], weights=values[valid], minlength=n_clusters)
+        return sums / np.bincount(codes[valid], minlength=n_clusters)
+    
+    n_meters = np.bincount(codes, minlength=n_clusters)
+    n_high_age = np.bincount(codes[age > age_threshold], minlength=n_clusters)
+    n_low_canya = np.bincount(codes[canya < canya_threshold], minlength=n_clusters)
+    
+    risk_df = pd.DataFrame({
+        "cluster_id": cluster_ids,
+        "n_meters": n_meters,
+        "avg_age": cluster_mean(age),
+        "avg_canya": cluster_mean(canya),
+        "pct_high_age": 100 * n_high_age / n_meters,
+        "pct_low_canya": 100 * n_low_canya / n_meters,
+    })
+    
+    # Risk score (higher = more suspicious)
+    # Weight: 40% age, 40% canya, 20% size (smaller clusters might be anomalies)
+    risk_df["risk_score"] = (
+        0.4 * (risk_df["pct_high_age"] / 100) +
+        0.4 * (1 - risk_df["pct_low_canya"] / 100) +  # Inverted: low canya = high risk
+        0.2 * (1 - risk_df["n_meters"] / len(merged))  # Smaller clusters = slightly higher risk
+    )
     
-    for cluster_id in sorted(merged["cluster_label"].unique()):
-        cluster_data = merged[merged["cluster_label"] == cluster_id]
-        
-        # Risk indicators
-        pct_high_age = 100 * (cluster_data["age"] > age_threshold).sum() / len(cluster_data)
-        pct_low_canya = 100 * (cluster_data["canya"] < canya_threshold).sum() / len(cluster_data)
-        avg_age = cluster_data["age"].mean()
-        avg_canya = cluster_data["canya"].mean()
-        
-        # Risk score (higher = more suspicious)
-        # Weight: 40% age, 40% canya, 20% size (smaller clusters might be anomalies)
-        risk_score = (
-            0.4 * (pct_high_age / 100) +
-            0.4 * (1 - pct_low_canya / 100) +  # Inverted: low canya = high risk
-            0.2 * (1 - len(cluster_data) / len(merged))  # Smaller clusters = slightly higher risk
-        )
-        
-        risk_scores.append({
-            "cluster_id": cluster_id,
-            "n_meters": len(cluster_data),
-            "avg_age": avg_age,
-            "avg_canya": avg_canya,
-            "pct_high_age": pct_high_age,
-            "pct_low_canya": pct_low_canya,
-            "risk_score": risk_score,
-        })
-    
-    risk_df = pd.DataFrame(risk_scores).sort_values("risk_score", ascending=False)
+    risk_df = risk_df.sort_values("risk_score", ascending=False)
     
     return risk_df
 
@@ -296,6 +402,7 @@ def identify_subcounting_patterns(
 def perform_statistical_tests(
     cluster_labels: pd.DataFrame,
     physical_features: pd.DataFrame,
+    merged: pd.DataFrame | None = None,
 ) -> Dict[str, pd.DataFrame]:
     """
     Perform statistical tests to validate cluster differences.
@@ -311,18 +418,24 @@ def perform_statistical_tests(
         DataFrame with meter_id and cluster_label
     physical_features : pd.DataFrame
         DataFrame with meter_id, age, diameter, canya, brand_model
+    merged : pd.DataFrame, optional
+        Pre-joined labels and features; computed from the two inputs if None
         
     Returns
     -------
     dict
         Dictionary with test results
     """
-    merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
+    if merged is None:
+        merged = _prepare_merged(cluster_labels, physical_features)
     
     results = {}
     
+    # Cluster codes shared by both ANOVAs
+    codes, _ = _cluster_codes(merged)
+    
     # ANOVA for age
-    age_groups = [group["age"].values for _, group in merged.groupby("cluster_label")]
+    age_groups = _split_by_cluster(merged, "age", codes)
     if len(age_groups) > 1 and all(len(g) > 1 for g in age_groups):
         f_stat_age, p_value_age = stats.f_oneway(*age_groups)
         results["age_anova"] = {
@@ -332,7 +445,7 @@ def perform_statistical_tests(
         }
     
     # ANOVA for canya
-    canya_groups = [group["canya"].values for _, group in merged.groupby("cluster_label")]
+    canya_groups = _split_by_cluster(merged, "canya", codes)
     if len(canya_groups) > 1 and all(len(g) > 1 for g in canya_groups):
         f_stat_canya, p_value_canya = stats.f_oneway(*canya_groups)
         results["canya_anova"] = {
@@ -342,7 +455,7 @@ def perform_statistical_tests(
         }
     
     # Chi-square for diameter
-    diameter_crosstab = pd.crosstab(merged["cluster_label"], merged["diameter"])
+    diameter_crosstab = _count_table(merged, "diameter")
     if diameter_crosstab.shape[0] > 1 and diameter_crosstab.shape[1] > 1:
         chi2_diam, p_diam, dof_diam, expected_diam = stats.chi2_contingency(diameter_crosstab)
         results["diameter_chi2"] = {
@@ -353,7 +466,7 @@ def perform_statistical_tests(
         }
     
     # Chi-square for brand_model
-    brand_model_crosstab = pd.crosstab(merged["cluster_label"], merged["brand_model"])
+    brand_model_crosstab = _count_table(merged, "brand_model")
     if brand_model_crosstab.shape[0] > 1 and brand_model_crosstab.shape[1] > 1:
         chi2_bm, p_bm, dof_bm, expected_bm = stats.chi2_contingency(brand_model_crosstab)
         results["brand_model_chi2"] = {
@@ -366,11 +479,28 @@ def perform_statistical_tests(
     return results
 
 
+def _to_parquet_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make an analysis frame Parquet-compatible.
+    
+    Column labels become strings (crosstab-style frames are keyed by diameter
+    values) and dict cells (value distributions) are stored as their string
+    form, exactly as they appear in the CSV output.
+    """
+    df = df.rename(columns=str)
+    for col in df.columns[df.dtypes == object]:
+        if df[col].map(lambda v: isinstance(v, dict)).any():
+            df[col] = df[col].map(lambda v: str(v) if isinstance(v, dict) else v)
+    return df
+
+
 def generate_cluster_report(
     cluster_labels: pd.DataFrame,
     db_path: str | Path = DEFAULT_DB_PATH,
     current_year: int = CURRENT_YEAR,
     output_dir: str | Path | None = None,
+    use_cache: bool = True,
+    csv: bool = True,
 ) -> Dict[str, pd.DataFrame | dict]:
     """
     Generate comprehensive cluster analysis report.
@@ -385,6 +515,15 @@ def generate_cluster_report(
         Current year for age calculation
     output_dir : str or Path, optional
         Directory to save analysis results (if None, uses stage3_outputs/)
+    use_cache : bool
+        Reuse the Parquet cache of the physical-features query shared with
+        Stage I (keyed on the query, current_year and the database file's
+        size/mtime, so rebuilding the database invalidates it). Set False to
+        always re-query DuckDB.
+    csv : bool
+        Also write each analysis table as CSV (the format read by the
+        visualization scripts). Parquet copies are always written; set False
+        to skip the slower CSV formatting.
         
     Returns
     -------
@@ -397,20 +536,27 @@ def generate_cluster_report(
     
     # Load physical features
     print("\nLoading physical features from database...")
-    physical_features = compute_physical_features(db_path=db_path, current_year=current_year)
+    physical_features = compute_physical_features(
+        db_path=db_path,
+        current_year=current_year,
+        use_cache=use_cache,
+    )
     print(f"  ✓ Loaded features for {len(physical_features):,} meters")
     
+    # Join labels and features once for every analysis below
+    merged = _prepare_merged(cluster_labels, physical_features)
+    
     # Perform comprehensive analysis
     print("\nPerforming cluster analysis...")
-    analysis_results = analyze_cluster_characteristics(cluster_labels, physical_features)
+    analysis_results = analyze_cluster_characteristics(cluster_labels, physical_features, merged=merged)
     
     # Identify subcounting patterns
     print("\nIdentifying potential subcounting patterns...")
-    subcounting_analysis = identify_subcounting_patterns(cluster_labels, physical_features)
+    subcounting_analysis = identify_subcounting_patterns(cluster_labels, physical_features, merged=merged)
     
     # Statistical tests
     print("\nPerforming statistical tests...")
-    statistical_tests = perform_statistical_tests(cluster_labels, physical_features)
+    statistical_tests = perform_statistical_tests(cluster_labels, physical_features, merged=merged)
     
     # Compile all results
     report = {
@@ -431,11 +577,14 @@ def generate_cluster_report(
         
         print(f"\nSaving analysis results to {output_dir}...")
         
-        # Save each DataFrame
+        # Save each DataFrame (Parquet always, CSV unless disabled)
         for key, value in report.items():
             if isinstance(value, pd.DataFrame):
-                output_path = output_dir / f"cluster_analysis_{key}.csv"
-                value.to_csv(output_path, index=False)
+                output_path = output_dir / f"cluster_analysis_{key}.parquet"
+                _to_parquet_frame(value).to_parquet(output_path, index=False)
+                if csv:
+                    output_path = output_path.with_suffix(".csv")
+                    value.to_csv(output_path, index=False)
                 print(f"  ✓ Saved {key} to {output_path}")
         
         # Save statistical tests as text
@@ -7,11 +7,14 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Literal, Tuple
 
+import duckdb
 import joblib
 import numpy as np
 import pandas as pd
-from sklearn.cluster import DBSCAN, KMeans
+from joblib import Parallel, delayed, parallel_config
+from sklearn.cluster import DBSCAN, HDBSCAN, KMeans, MiniBatchKMeans
 from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score, silhouette_score
+from sklearn.neighbors import BallTree
 
 DEFAULT_LATENT_PATH = Path(__file__).resolve().parents[1] / "stage2_outputs" / "latent_representations.csv"
 DEFAULT_MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
@@ -19,6 +22,9 @@ DEFAULT_MODELS_DIR = Path(__file__).resolve().parents[1] / "models"
 # Excluded counters
 EXCLUDED_COUNTERS = ["5J526OPLVVS2L47O", "QEPJ3GL36LPH6JMU"]
 
+# Silhouette is O(n^2); above this many samples it is estimated on a random subset
+SILHOUETTE_SAMPLE_SIZE = 10_000
+
 
 def load_latent_representations(
     latent_path: str | Path = DEFAULT_LATENT_PATH,
@@ -37,10 +43,38 @@ def load_latent_representations(
         (DataFrame with meter_id and latent vectors, numpy array of latent vectors)
     """
     latent_path = Path(latent_path)
-    if not latent_path.exists():
+    
+    # Prefer a Parquet copy next to the CSV unless the CSV is newer
+    parquet_path = latent_path.with_suffix(".parquet")
+    use_parquet = parquet_path.exists() and (
+        not latent_path.exists()
+        or parquet_path.stat().st_mtime >= latent_path.stat().st_mtime
+    )
+    if not use_parquet and not latent_path.exists():
         raise FileNotFoundError(f"Latent representations file not found: {latent_path}")
     
-    df = pd.read_csv(latent_path)
+    if use_parquet:
+        df = pd.read_parquet(parquet_path)
+        latent_cols = [col for col in df.columns if col.startswith("z_")]
+    else:
+        # Parse with DuckDB's parallel CSV reader, casting latent columns straight
+        # to float32 (half the memory traffic for KMeans and the cluster metrics)
+        con = duckdb.connect()
+        header = con.execute("SELECT * FROM read_csv(?, header = true) LIMIT 0", [str(latent_path)])
+        latent_cols = [col[0] for col in header.description if col[0].startswith("z_")]
+        casts = ", ".join(f'CAST("{col}" AS FLOAT) AS "{col}"' for col in latent_cols)
+        select_list = f"* REPLACE ({casts})" if casts else "*"
+        df = con.execute(
+            f"SELECT {select_list} FROM read_csv(?, header = true)",
+            [str(latent_path)],
+        ).df()
+        con.close()
+        
+        # Cache as Parquet so later runs skip CSV parsing
+        try:
+            df.to_parquet(parquet_path, index=False, compression="zstd")
+        except OSError:
+            pass
     
     # Filter out excluded counters
     if EXCLUDED_COUNTERS:
@@ -52,20 +86,68 @@ def load_latent_representations(
     
     # Extract meter IDs and latent vectors
     meter_ids = df["meter_id"].values
-    latent_cols = [col for col in df.columns if col.startswith("z_")]
-    latent_vectors = df[latent_cols].values
+    latent_vectors = np.ascontiguousarray(df[latent_cols].to_numpy(dtype=np.float32))
+    # sklearn copies non-C-ordered input on every fit/score call
+    assert latent_vectors.flags["C_CONTIGUOUS"]
     
     print(f"Loaded {len(df):,} latent representations with {len(latent_cols)} dimensions")
     
     return df, latent_vectors
 
 
+def _has_cluster_structure(labels: np.ndarray) -> bool:
+    """
+    Return True when labels contain at least two non-noise clusters.
+    
+    Silhouette, Calinski-Harabasz and Davies-Bouldin are undefined otherwise,
+    so callers report NaN instead of computing them.
+    """
+    uniq = np.unique(labels)
+    return uniq.size - int(uniq.size > 0 and uniq[0] == -1) >= 2
+
+
+def _faiss_kmeans(
+    latent_vectors: np.ndarray,
+    n_clusters: int,
+    *,
+    random_state: int,
+    n_init: int,
+    max_iter: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run faiss KMeans (BLAS-tiled distance computation).
+    
+    Returns (centroids, labels). faiss is an optional dependency and is only
+    imported when this backend is requested.
+    """
+    try:
+        import faiss
+    except ImportError as exc:
+        raise ImportError(
+            "KMeans backend 'faiss' requires the faiss package (pip install faiss-cpu)"
+        ) from exc
+    
+    X = np.ascontiguousarray(latent_vectors, dtype=np.float32)
+    kmeans = faiss.Kmeans(
+        X.shape[1],
+        n_clusters,
+        niter=max_iter,
+        nredo=n_init,
+        seed=random_state,
+        gpu=False,
+    )
+    kmeans.train(X)
+    _, labels = kmeans.index.search(X, 1)
+    return kmeans.centroids, labels.ravel().astype(np.int32)
+
+
 def perform_kmeans_clustering(
     latent_vectors: np.ndarray,
     n_clusters: int = 8,
     random_state: int = 42,
     n_init: int = 10,
     max_iter: int = 300,
+    backend: Literal["sklearn", "faiss"] = "sklearn",
 ) -> Tuple[KMeans, np.ndarray]:
     """
     Perform KMeans clustering on latent vectors.
@@ -82,6 +164,10 @@ def perform_kmeans_clustering(
         Number of times KMeans will be run with different centroid seeds
     max_iter : int
         Maximum number of iterations
+    backend : str
+        "sklearn" (default) or "faiss". With "faiss", centroids are found by
+        faiss and then loaded into a scikit-learn KMeans (a single refinement
+        pass), so the returned model is still a picklable ``KMeans``.
         
     Returns
     -------
@@ -90,20 +176,46 @@ def perform_kmeans_clustering(
     """
     print(f"\nPerforming KMeans clustering with k={n_clusters}...")
     
-    kmeans = KMeans(
-        n_clusters=n_clusters,
-        random_state=random_state,
-        n_init=n_init,
-        max_iter=max_iter,
-        verbose=1,
-    )
+    if backend == "faiss":
+        centroids, _ = _faiss_kmeans(
+            latent_vectors,
+            n_clusters,
+            random_state=random_state,
+            n_init=n_init,
+            max_iter=max_iter,
+        )
+        kmeans = KMeans(
+            n_clusters=n_clusters,
+            init=centroids,
+            n_init=1,
+            max_iter=1,
+            random_state=random_state,
+        )
+    elif backend == "sklearn":
+        kmeans = KMeans(
+            n_clusters=n_clusters,
+            random_state=random_state,
+            n_init=n_init,
+            max_iter=max_iter,
+            verbose=1,
+        )
+    else:
+        raise ValueError(f"Unknown KMeans backend: {backend}. Use 'sklearn' or 'faiss'")
     
     labels = kmeans.fit_predict(latent_vectors)
     
     # Compute evaluation metrics
-    silhouette = silhouette_score(latent_vectors, labels)
-    calinski_harabasz = calinski_harabasz_score(latent_vectors, labels)
-    davies_bouldin = davies_bouldin_score(latent_vectors, labels)
+    if _has_cluster_structure(labels):
+        silhouette = silhouette_score(
+            latent_vectors,
+            labels,
+            sample_size=min(SILHOUETTE_SAMPLE_SIZE, len(labels)),
+            random_state=random_state,
+        )
+        calinski_harabasz = calinski_harabasz_score(latent_vectors, labels)
+        davies_bouldin = davies_bouldin_score(latent_vectors, labels)
+    else:
+        silhouette = calinski_harabasz = davies_bouldin = float("nan")
     
     print(f"  ✓ Clustering complete")
     print(f"  - Silhouette score: {silhouette:.4f}")
@@ -119,7 +231,8 @@ def perform_dbscan_clustering(
     eps: float = 0.5,
     min_samples: int = 5,
     metric: str = "euclidean",
-) -> Tuple[DBSCAN, np.ndarray]:
+    use_hdbscan: bool = False,
+) -> Tuple[DBSCAN | HDBSCAN, np.ndarray]:
     """
     Perform DBSCAN clustering on latent vectors.
     
@@ -133,39 +246,125 @@ def perform_dbscan_clustering(
         Minimum number of samples in a neighborhood for a point to be a core point
     metric : str
         Distance metric to use
+    use_hdbscan : bool
+        If True, run HDBSCAN (min_cluster_size=min_samples, eps ignored)
+        instead of DBSCAN. It needs no eps tuning and scales better on
+        large meter counts
         
     Returns
     -------
     tuple
-        (Fitted DBSCAN model, cluster labels where -1 indicates noise)
+        (Fitted DBSCAN/HDBSCAN model, cluster labels where -1 indicates noise)
     """
-    print(f"\nPerforming DBSCAN clustering with eps={eps}, min_samples={min_samples}...")
+    # Ball-tree index for the eps-neighbourhood queries (falls back to
+    # sklearn's choice for metrics the ball tree does not support)
+    algorithm = "ball_tree" if metric in BallTree.valid_metrics else "auto"
     
-    dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric=metric)
+    if use_hdbscan:
+        print(f"\nPerforming HDBSCAN clustering with min_cluster_size={min_samples}...")
+        dbscan = HDBSCAN(
+            min_cluster_size=min_samples,
+            metric=metric,
+            algorithm=algorithm,
+            leaf_size=40,
+            n_jobs=-1,
+            copy=True,
+        )
+    else:
+        print(f"\nPerforming DBSCAN clustering with eps={eps}, min_samples={min_samples}...")
+        dbscan = DBSCAN(
+            eps=eps,
+            min_samples=min_samples,
+            metric=metric,
+            algorithm=algorithm,
+            leaf_size=40,
+            n_jobs=-1,
+        )
     labels = dbscan.fit_predict(latent_vectors)
     
-    n_clusters = len(set(labels)) - (1 if -1 in labels else 0)
-    n_noise = list(labels).count(-1)
+    noise_mask = labels == -1
+    n_noise = int(np.count_nonzero(noise_mask))
+    n_clusters = np.unique(labels).size - (1 if n_noise > 0 else 0)
     
     print(f"  ✓ Clustering complete")
     print(f"  - Number of clusters: {n_clusters}")
     print(f"  - Number of noise points: {n_noise:,} ({100*n_noise/len(labels):.2f}%)")
     
-    if n_clusters > 0:
+    if n_clusters >= 2:
         # Compute metrics only for non-noise points
-        non_noise_mask = labels != -1
-        if non_noise_mask.sum() > 1:
+        non_noise_mask = ~noise_mask
+        if non_noise_mask.sum() > n_clusters:
             silhouette = silhouette_score(latent_vectors[non_noise_mask], labels[non_noise_mask])
             print(f"  - Silhouette score (excluding noise): {silhouette:.4f}")
     
     return dbscan, labels
 
 
+def _evaluate_k(
+    latent_vectors: np.ndarray,
+    k: int,
+    *,
+    random_state: int,
+    n_init: int,
+    minibatch: bool,
+    batch_size: int,
+    backend: str,
+) -> dict:
+    """Fit one k of the sweep and return its silhouette, CH and DB scores."""
+    if backend == "faiss":
+        _, labels = _faiss_kmeans(
+            latent_vectors,
+            k,
+            random_state=random_state,
+            n_init=n_init,
+            max_iter=300,
+        )
+    else:
+        if minibatch:
+            kmeans = MiniBatchKMeans(
+                n_clusters=k,
+                random_state=random_state,
+                batch_size=batch_size,
+                n_init=3,
+                max_iter=100,
+            )
+        else:
+            kmeans = KMeans(
+                n_clusters=k,
+                random_state=random_state,
+                n_init=n_init,
+                max_iter=300,
+            )
+        labels = kmeans.fit_predict(latent_vectors)
+    
+    if not _has_cluster_structure(labels):
+        nan = float("nan")
+        return {"silhouette": nan, "calinski_harabasz": nan, "davies_bouldin": nan}
+    
+    # Compute silhouette score (sampled for large inputs)
+    silhouette = silhouette_score(
+        latent_vectors,
+        labels,
+        sample_size=min(SILHOUETTE_SAMPLE_SIZE, len(labels)),
+        random_state=random_state,
+    )
+    
+    return {
+        "silhouette": silhouette,
+        "calinski_harabasz": calinski_harabasz_score(latent_vectors, labels),
+        "davies_bouldin": davies_bouldin_score(latent_vectors, labels),
+    }
+
+
 def find_optimal_k(
     latent_vectors: np.ndarray,
     k_range: range | list[int] = range(2, 21),
     random_state: int = 42,
     n_init: int = 10,
+    minibatch: bool = True,
+    batch_size: int = 4096,
+    n_jobs: int = -1,
+    backend: Literal["sklearn", "faiss"] = "sklearn",
 ) -> Tuple[int, dict]:
     """
     Find optimal number of clusters using silhouette score.
@@ -179,7 +378,19 @@ def find_optimal_k(
     random_state : int
         Random seed
     n_init : int
-        Number of KMeans runs per k
+        Number of KMeans runs per k (full KMeans sweep only)
+    minibatch : bool
+        If True, score each k with a MiniBatchKMeans fit (3 inits, 100
+        iterations). This is much cheaper than full KMeans and ranks k almost
+        identically; the chosen k is refit with full KMeans afterwards.
+    batch_size : int
+        Mini-batch size for the MiniBatchKMeans sweep
+    n_jobs : int
+        Number of k values fitted in parallel (-1 uses all cores). Each
+        worker is limited to one BLAS/OpenMP thread to avoid oversubscription.
+    backend : str
+        "sklearn" (default) or "faiss" (requires the faiss package; ignores
+        ``minibatch``)
         
     Returns
     -------
@@ -188,36 +399,39 @@ def find_optimal_k(
     """
     print("\nFinding optimal k using silhouette score...")
     
+    # Convert once up front rather than letting every fit in the sweep copy
+    latent_vectors = np.ascontiguousarray(latent_vectors, dtype=np.float32)
+    
+    # Fits for different k are independent: run them in parallel processes
+    k_values = list(k_range)
+    with parallel_config(backend="loky", inner_max_num_threads=1):
+        results = Parallel(n_jobs=n_jobs, batch_size=1)(
+            delayed(_evaluate_k)(
+                latent_vectors,
+                k,
+                random_state=random_state,
+                n_init=n_init,
+                minibatch=minibatch,
+                batch_size=batch_size,
+                backend=backend,
+            )
+            for k in k_values
+        )
+    
     scores = {}
     best_k = None
     best_score = -1
     
-    for k in k_range:
-        kmeans = KMeans(
-            n_clusters=k,
-            random_state=random_state,
-            n_init=n_init,
-            max_iter=300,
-        )
-        labels = kmeans.fit_predict(latent_vectors)
-        
-        # Compute silhouette score
-        silhouette = silhouette_score(latent_vectors, labels)
-        calinski_harabasz = calinski_harabasz_score(latent_vectors, labels)
-        davies_bouldin = davies_bouldin_score(latent_vectors, labels)
-        
-        scores[k] = {
-            "silhouette": silhouette,
-            "calinski_harabasz": calinski_harabasz,
-            "davies_bouldin": davies_bouldin,
-        }
+    for k, k_scores in zip(k_values, results):
+        scores[k] = k_scores
+        silhouette = k_scores["silhouette"]
         
         if silhouette > best_score:
             best_score = silhouette
             best_k = k
         
         print(f"  k={k:2d}: silhouette={silhouette:.4f}, "
-              f"CH={calinski_harabasz:.2f}, DB={davies_bouldin:.4f}")
+              f"CH={k_scores['calinski_harabasz']:.2f}, DB={k_scores['davies_bouldin']:.4f}")
     
     print(f"\n  ✓ Optimal k: {best_k} (silhouette score: {best_score:.4f})")
     
@@ -232,9 +446,11 @@ def cluster_latent_space(
     k_range: range | list[int] = range(2, 21),
     dbscan_eps: float = 0.5,
     dbscan_min_samples: int = 5,
+    dbscan_use_hdbscan: bool = False,
     save_model: bool = True,
     models_dir: str | Path = DEFAULT_MODELS_DIR,
     random_state: int = 42,
+    kmeans_backend: Literal["sklearn", "faiss"] = "sklearn",
 ) -> Tuple[pd.DataFrame, object]:
     """
     Main function to cluster latent space representations.
@@ -255,12 +471,17 @@ def cluster_latent_space(
         Epsilon parameter for DBSCAN
     dbscan_min_samples : int
         Min samples parameter for DBSCAN
+    dbscan_use_hdbscan : bool
+        Run HDBSCAN instead of DBSCAN when method="dbscan"
     save_model : bool
         Whether to save the fitted model
     models_dir : str or Path
         Directory to save models
     random_state : int
         Random seed
+    kmeans_backend : str
+        KMeans implementation for the k-sweep and final fit: "sklearn"
+        (default) or "faiss" (requires the faiss package)
         
     Returns
     -------
@@ -273,7 +494,12 @@ def cluster_latent_space(
     # Perform clustering
     if method == "kmeans":
         if auto_optimize_k and n_clusters is None:
-            optimal_k, scores = find_optimal_k(latent_vectors, k_range=k_range, random_state=random_state)
+            optimal_k, scores = find_optimal_k(
+                latent_vectors,
+                k_range=k_range,
+                random_state=random_state,
+                backend=kmeans_backend,
+            )
             n_clusters = optimal_k
         
         if n_clusters is None:
@@ -283,6 +509,7 @@ def cluster_latent_space(
             latent_vectors,
             n_clusters=n_clusters,
             random_state=random_state,
+            backend=kmeans_backend,
         )
         
     elif method == "dbscan":
@@ -290,6 +517,7 @@ def cluster_latent_space(
             latent_vectors,
             eps=dbscan_eps,
             min_samples=dbscan_min_samples,
+            use_hdbscan=dbscan_use_hdbscan,
         )
         
     else:
@@ -8,20 +8,261 @@ Computes failure risk scores based on:
 
 from __future__ import annotations
 
+import hashlib
+import os
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
+from joblib import Parallel, delayed
+from scipy.linalg import cholesky, solve_triangular
 
-from subcounting_detection import SubcountingConfig, compute_subcounting_scores
+# Row blocks of the distance kernel are sized to stay cache-resident
+DISTANCE_CHUNK_BYTES = 2**20
+
+
+def read_csv_cached(
+    csv_path: str | Path,
+    usecols: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read a CSV input, going through a Parquet copy stored next to it.
+
+    The .parquet sidecar is used when it is at least as new as the CSV.
+    Otherwise the CSV is parsed with pyarrow and the sidecar (re)written
+    with all columns, so later runs skip CSV parsing whatever usecols is.
+    """
+    csv_path = Path(csv_path)
+    parquet_path = csv_path.with_suffix(".parquet")
+    if parquet_path.exists() and (
+        not csv_path.exists()
+        or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime
+    ):
+        return pd.read_parquet(parquet_path, columns=usecols)
+
+    df = pd.read_csv(csv_path, engine="pyarrow")
+    try:
+        df.to_parquet(parquet_path, index=False, compression="zstd")
+    except OSError:
+        pass
+    return df[usecols] if usecols is not None else df
+
+
+def _align_rows(
+    ids: np.ndarray,
+    meter_ids: np.ndarray,
+    allow_missing: bool = False,
+) -> np.ndarray:
+    """
+    Return the row positions in ids matching each entry of meter_ids.
+
+    Sort-and-search join on the raw arrays. A meter missing from ids raises
+    KeyError, or gets position -1 when allow_missing is True.
+    """
+    if np.array_equal(ids, meter_ids):
+        return np.arange(len(ids))
+    if ids.dtype == object:
+        # String ids: sort as fixed-width unicode rather than Python objects
+        ids, meter_ids = ids.astype(str), meter_ids.astype(str)
+    if len(ids) == 0:
+        if allow_missing:
+            return np.full(len(meter_ids), -1)
+        raise KeyError(f"{len(meter_ids)} meter_id(s) not found")
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    pos = np.searchsorted(sorted_ids, meter_ids).clip(max=len(sorted_ids) - 1)
+    found = sorted_ids[pos] == meter_ids
+    if allow_missing:
+        return np.where(found, order[pos], -1)
+    if not found.all():
+        missing = meter_ids[~found]
+        raise KeyError(f"{len(missing)} meter_id(s) not found, e.g. {missing[:5].tolist()}")
+    return order[pos]
+
+
+def _encode_clusters(
+    cluster_labels: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Return (sorted unique cluster ids, dense labels in [0, K), cluster sizes).
+
+    Computed once per run and shared by the anomaly and degradation steps.
+    """
+    unique_clusters, dense_labels, counts = np.unique(
+        cluster_labels, return_inverse=True, return_counts=True
+    )
+    return unique_clusters, dense_labels, counts
+
+
+def _minmax_normalize(values: np.ndarray) -> np.ndarray:
+    """
+    Scale values to [0, 1], or all zeros when every value is the same.
+
+    NaNs are ignored when finding the range and stay NaN, as with sklearn's
+    MinMaxScaler. The shift and scale are applied in place on a single new
+    array, so the input is traversed once for each of min, max and the rescale.
+    """
+    lo = np.nanmin(values)
+    span = np.nanmax(values) - lo
+    if span > 0:
+        normalized = values - lo
+        normalized /= span
+        return normalized
+    return np.zeros(values.shape)
+
+
+def _centroid_distances(
+    points: np.ndarray,
+    centroids: np.ndarray,
+    dense_labels: np.ndarray,
+) -> np.ndarray:
+    """
+    Euclidean distance from each point to the centroid of its cluster.
+
+    Rows are streamed in blocks of about DISTANCE_CHUNK_BYTES. Each block is
+    transposed to [z_dim, rows] so every pass streams a contiguous row, and the
+    squared distance is accumulated one latent dimension at a time. Peak extra
+    memory is bounded by the block size rather than by n_meters.
+    """
+    n_points, z_dim = points.shape
+    chunk = max(1, DISTANCE_CHUNK_BYTES // (z_dim * points.itemsize))
+    centroids_t = np.ascontiguousarray(centroids.T)
+    distances = np.empty(n_points)
+    delta = np.empty(min(chunk, n_points))
+    for start in range(0, n_points, chunk):
+        stop = min(start + chunk, n_points)
+        block_t = np.ascontiguousarray(points[start:stop].T)
+        labels = dense_labels[start:stop]
+        sq_dist = distances[start:stop]
+        buf = delta[: stop - start]
+        sq_dist[:] = 0.0
+        for d in range(z_dim):
+            # Gather, subtract and square all in the one reused buffer
+            centroids_t[d].take(labels, out=buf)
+            np.subtract(block_t[d], buf, out=buf)
+            np.square(buf, out=buf)
+            sq_dist += buf
+    return np.sqrt(distances, out=distances)
+
+
+def _regularized_cholesky(cluster_points: np.ndarray) -> np.ndarray:
+    """Lower Cholesky factor of one cluster's covariance (plus 1e-6 * I)."""
+    z_dim = cluster_points.shape[1]
+    cov = np.cov(cluster_points.T.astype(np.float64))
+    
+    # Add small regularization to avoid singular matrix
+    cov += np.eye(z_dim) * 1e-6
+    return cholesky(cov, lower=True)
+
+
+def _mahalanobis_rows(
+    points: np.ndarray,
+    rows: np.ndarray,
+    centroid: np.ndarray,
+    L: Optional[np.ndarray],
+    out: np.ndarray,
+) -> None:
+    """
+    Write the distances of points[rows] to centroid into out[rows].
+
+    With a Cholesky factor L the points are transformed once, y = L^-1 x,
+    and d^2 = y.y + yc.yc - 2 yc.y with yc = L^-1 c, so no per-meter
+    difference array is built (the subtraction is safe in float64). Without
+    L (cluster too small for a covariance) the Euclidean distance is used.
+    Rows are disjoint across clusters, so calls can run in parallel.
+    """
+    block = points[rows]
+    if L is None:
+        out[rows] = _centroid_distances(block, centroid[None, :], np.zeros(len(rows), dtype=np.intp))
+        return
+    y = solve_triangular(L, block.T.astype(np.float64), lower=True, check_finite=False)
+    yc = solve_triangular(L, centroid, lower=True, check_finite=False)
+    sq_dist = np.einsum("ij,ij->j", y, y)
+    sq_dist -= 2.0 * (yc @ y)
+    sq_dist += yc @ yc
+    out[rows] = np.sqrt(np.maximum(sq_dist, 0.0, out=sq_dist), out=sq_dist)
+
+
+def _cluster_geometry(
+    latent_vectors: np.ndarray,
+    dense_labels: np.ndarray,
+    counts: np.ndarray,
+    *,
+    mahalanobis: bool,
+    cache_dir: Optional[str | Path] = None,
+    n_jobs: int = -1,
+) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Return per-cluster centroids and, for Mahalanobis, lower Cholesky factors.
+
+    Factors are only filled for clusters with at least z_dim points (the
+    rest fall back to Euclidean distance). For Mahalanobis, results are
+    cached in ``cache_dir`` (if given) under a hash of the latent vectors
+    and labels, so re-scoring the same clustering (e.g. while tuning
+    w1/w2/alpha/beta) skips the Cholesky factorizations. Only the latest
+    entry is kept. Euclidean centroids are a single reduceat, cheaper than
+    hashing the inputs, and are never cached.
+    """
+    z_dim = latent_vectors.shape[1]
+    cache_path = None
+    if cache_dir is not None and mahalanobis:
+        digest = hashlib.sha1(repr((latent_vectors.shape, str(latent_vectors.dtype))).encode())
+        digest.update(np.ascontiguousarray(latent_vectors).data)
+        digest.update(np.ascontiguousarray(dense_labels).data)
+        cache_path = Path(cache_dir) / f"mahalanobis_{digest.hexdigest()[:16]}.npz"
+        if cache_path.exists():
+            with np.load(cache_path) as cached:
+                return cached["centroids"], cached["chol"]
+
+    # Centroids in one pass: group rows by cluster, then sum each
+    # contiguous block
+    order = np.argsort(dense_labels, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sorted_points = latent_vectors[order]
+    centroids = (
+        np.add.reduceat(sorted_points, starts, axis=0, dtype=np.float64)
+        / counts[:, None]
+    )
+
+    chol = None
+    if mahalanobis:
+        chol = np.zeros((len(counts), z_dim, z_dim))
+        # Clusters are independent and numpy/LAPACK release the GIL, so
+        # threads are enough to spread them over the cores
+        eligible = np.flatnonzero(counts >= z_dim)
+        blocks = np.split(sorted_points, starts[1:])
+        factors = Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(_regularized_cholesky)(blocks[k]) for k in eligible
+        )
+        for k, L in zip(eligible, factors):
+            chol[k] = L
+
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename, so an interrupted run never
+        # leaves a truncated archive under the final name
+        tmp_path = cache_path.with_name(f".{cache_path.stem}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, centroids=centroids, chol=chol)
+            os.replace(tmp_path, cache_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        for stale in cache_path.parent.glob("mahalanobis_*.npz"):
+            if stale != cache_path:
+                stale.unlink(missing_ok=True)
+
+    return centroids, chol
 
 
 def compute_intra_cluster_anomaly_scores(
     latent_vectors: np.ndarray,
     cluster_labels: np.ndarray,
     distance_metric: str = "euclidean",
+    cache_dir: Optional[str | Path] = None,
+    n_jobs: int = -1,
+    encoded: Optional[tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
 ) -> np.ndarray:
     """
     Compute anomaly scores based on distance to cluster centroids.
@@ -35,6 +276,16 @@ def compute_intra_cluster_anomaly_scores(
     distance_metric : str
         Distance metric to use. Options: 'euclidean', 'mahalanobis'.
         Default: 'euclidean'.
+    cache_dir : str | Path, optional
+        Directory in which Mahalanobis centroids and Cholesky factors are
+        cached for identical inputs. Default: None (no caching; the
+        Euclidean metric is never cached).
+    n_jobs : int
+        Threads used for the per-cluster Mahalanobis work. Default: -1 (all
+        cores).
+    encoded : tuple, optional
+        Precomputed ``_encode_clusters(cluster_labels)``, to skip re-sorting
+        the labels.
 
     Returns
     -------
@@ -42,58 +293,42 @@ def compute_intra_cluster_anomaly_scores(
         Normalized anomaly scores in [0, 1] for each meter.
     """
     n_meters, z_dim = latent_vectors.shape
-    unique_clusters = np.unique(cluster_labels)
-    distances = np.zeros(n_meters)
+    if distance_metric not in ("euclidean", "mahalanobis"):
+        raise ValueError(f"Unknown distance metric: {distance_metric}")
+
+    if encoded is None:
+        encoded = _encode_clusters(cluster_labels)
+    _, dense_labels, counts = encoded
+    centroids, chol = _cluster_geometry(
+        latent_vectors,
+        dense_labels,
+        counts,
+        mahalanobis=distance_metric == "mahalanobis",
+        cache_dir=cache_dir,
+        n_jobs=n_jobs,
+    )
 
     if distance_metric == "euclidean":
-        for cluster_id in unique_clusters:
-            mask = cluster_labels == cluster_id
-            cluster_points = latent_vectors[mask]
-            centroid = np.mean(cluster_points, axis=0)
-            
-            # Compute Euclidean distance to centroid
-            cluster_distances = np.linalg.norm(
-                latent_vectors[mask] - centroid, axis=1
-            )
-            distances[mask] = cluster_distances
-
-    elif distance_metric == "mahalanobis":
-        for cluster_id in unique_clusters:
-            mask = cluster_labels == cluster_id
-            cluster_points = latent_vectors[mask]
-            
-            if len(cluster_points) < z_dim:
-                # Fallback to Euclidean if not enough points for covariance
-                centroid = np.mean(cluster_points, axis=0)
-                distances[mask] = np.linalg.norm(
-                    latent_vectors[mask] - centroid, axis=1
-                )
-            else:
-                centroid = np.mean(cluster_points, axis=0)
-                cov = np.cov(cluster_points.T)
-                
-                # Add small regularization to avoid singular matrix
-                cov += np.eye(z_dim) * 1e-6
-                inv_cov = np.linalg.inv(cov)
-                
-                # Compute Mahalanobis distance
-                diff = latent_vectors[mask] - centroid
-                mahal_distances = np.sqrt(
-                    np.sum(diff @ inv_cov * diff, axis=1)
-                )
-                distances[mask] = mahal_distances
-    else:
-        raise ValueError(f"Unknown distance metric: {distance_metric}")
+        distances = _centroid_distances(latent_vectors, centroids, dense_labels)
 
-    # Normalize distances to [0, 1]
-    d_min, d_max = distances.min(), distances.max()
-    if d_max > d_min:
-        normalized_scores = (distances - d_min) / (d_max - d_min)
     else:
-        # All distances are the same
-        normalized_scores = np.zeros(n_meters)
+        distances = np.empty(n_meters)
+        order = np.argsort(dense_labels, kind="stable")
+        cluster_rows = np.split(order, np.cumsum(counts)[:-1])
+        Parallel(n_jobs=n_jobs, prefer="threads")(
+            delayed(_mahalanobis_rows)(
+                latent_vectors,
+                cluster_rows[k],
+                centroids[k],
+                # Fallback to Euclidean if not enough points for covariance
+                chol[k] if counts[k] >= z_dim else None,
+                distances,
+            )
+            for k in range(len(counts))
+        )
 
-    return normalized_scores
+    # Normalize distances to [0, 1]
+    return _minmax_normalize(distances)
 
 
 def compute_cluster_degradation(
@@ -101,6 +336,7 @@ def compute_cluster_degradation(
     cluster_labels: np.ndarray,
     alpha: float = 0.6,
     beta: float = 0.4,
+    encoded: Optional[tuple[np.ndarray, np.ndarray, np.ndarray]] = None,
 ) -> pd.Series:
     """
     Compute degradation index for each cluster based on age and canya.
@@ -115,59 +351,35 @@ def compute_cluster_degradation(
         Weight for age component. Default: 0.6.
     beta : float
         Weight for canya component. Default: 0.4.
+    encoded : tuple, optional
+        Precomputed ``_encode_clusters(cluster_labels)``, to skip re-sorting
+        the labels.
 
     Returns
     -------
     pd.Series
-        Series indexed by cluster_id with degradation scores in [0, 1].
+        Series indexed by cluster_id (sorted ascending) with degradation
+        scores in [0, 1].
     """
-    # Add cluster labels to dataframe
-    df_merged = df_physical.copy()
-    df_merged["cluster_label"] = cluster_labels
-    
     # Normalize age and canya across all meters
-    scaler_age = MinMaxScaler()
-    scaler_canya = MinMaxScaler()
-    
-    age_normalized = scaler_age.fit_transform(
-        df_merged[["age"]].values
-    ).flatten()
-    canya_normalized = scaler_canya.fit_transform(
-        df_merged[["canya"]].values
-    ).flatten()
+    age_normalized = _minmax_normalize(df_physical["age"].to_numpy(dtype=np.float64))
+    canya_normalized = _minmax_normalize(df_physical["canya"].to_numpy(dtype=np.float64))
     
-    # Compute degradation per cluster
-    cluster_degradation = {}
+    # Mean normalized age and canya per cluster (one bincount pass each)
+    if encoded is None:
+        encoded = _encode_clusters(cluster_labels)
+    unique_clusters, dense_labels, counts = encoded
+    mean_age = np.bincount(dense_labels, weights=age_normalized) / counts
+    mean_canya = np.bincount(dense_labels, weights=canya_normalized) / counts
     
-    for cluster_id in df_merged["cluster_label"].unique():
-        mask = df_merged["cluster_label"] == cluster_id
-        cluster_age = age_normalized[mask]
-        cluster_canya = canya_normalized[mask]
-        
-        # Mean normalized age and canya for this cluster
-        mean_age = np.mean(cluster_age)
-        mean_canya = np.mean(cluster_canya)
-        
-        # Degradation index
-        D_k = alpha * mean_age + beta * mean_canya
-        cluster_degradation[cluster_id] = D_k
+    # Degradation index
+    degradation_values = alpha * mean_age + beta * mean_canya
     
     # Normalize degradation scores across clusters to [0, 1]
-    degradation_values = np.array(list(cluster_degradation.values()))
-    d_min, d_max = degradation_values.min(), degradation_values.max()
-    
-    if d_max > d_min:
-        normalized_degradation = {
-            cluster_id: (D_k - d_min) / (d_max - d_min)
-            for cluster_id, D_k in cluster_degradation.items()
-        }
-    else:
-        normalized_degradation = {
-            cluster_id: 0.0
-            for cluster_id in cluster_degradation.keys()
-        }
-    
-    return pd.Series(normalized_degradation)
+    return pd.Series(
+        _minmax_normalize(degradation_values),
+        index=unique_clusters,
+    )
 
 
 def compute_risk_scores(
@@ -180,25 +392,31 @@ def compute_risk_scores(
     alpha: float = 0.6,
     beta: float = 0.4,
     distance_metric: str = "euclidean",
+    use_cache: bool = True,
     # Subcounting integration
     enable_subcounting: bool = True,
     subcount_gamma: float = 0.8,
     use_subcount_cluster_peers: bool = False,
     subcount_db_path: Optional[str | Path] = None,
-) -> pd.DataFrame:
+    top_k: Optional[int] = None,
+    return_physical: bool = False,
+) -> pd.DataFrame | tuple[pd.DataFrame, pd.DataFrame]:
     """
     Compute failure risk scores for all meters.
 
     Parameters
     ----------
     latent_path : str | Path
-        Path to latent_representations.csv.
+        Path to latent_representations.csv (a fresher .parquet copy next to
+        it is used instead when present).
     cluster_labels_path : str | Path
-        Path to cluster_labels.csv.
+        Path to cluster_labels.csv (cached as .parquet next to it).
     physical_features_path : str | Path
-        Path to physical features CSV (must contain age, canya).
+        Path to physical features CSV (must contain age, canya; cached as
+        .parquet next to it).
     output_path : str | Path, optional
-        Path to save results. If None, returns DataFrame only.
+        Path to save results as CSV, with a .parquet copy next to it. If
+        None, returns DataFrame only.
     w1 : float
         Weight for anomaly score component. Default: 0.5.
     w2 : float
@@ -209,6 +427,12 @@ def compute_risk_scores(
         Weight for canya in degradation calculation. Default: 0.4.
     distance_metric : str
         Distance metric for anomaly calculation. Default: 'euclidean'.
+    use_cache : bool
+        With ``distance_metric="mahalanobis"``, reuse per-cluster centroids
+        / Cholesky factors cached in a ``cache`` directory next to
+        ``output_path`` while the latent vectors and cluster labels are
+        unchanged. No effect without ``output_path`` or for the Euclidean
+        metric. Default: True.
     enable_subcounting : bool
         If True, compute and integrate subcounting scores into final risk.
     subcount_gamma : float
@@ -220,11 +444,19 @@ def compute_risk_scores(
     subcount_db_path : str | Path, optional
         Path to DuckDB analytics database. If None, the default path used
         in the subcounting module is applied.
+    top_k : int, optional
+        If given, only the top_k highest-risk meters are returned (and
+        saved). They are selected with a partial sort, so the full ranking
+        of all meters is never built.
+    return_physical : bool
+        If True, also return the physical features DataFrame as loaded
+        here, so callers can reuse it instead of reading the file again.
 
     Returns
     -------
     pd.DataFrame
-        DataFrame with columns:
+        DataFrame (or (DataFrame, physical features DataFrame) when
+        return_physical is True) with columns:
         - meter_id
         - cluster_id
         - anomaly_score
@@ -234,72 +466,74 @@ def compute_risk_scores(
         - subcount_percent: Subcounting probability in percentage (0-100)
         - risk_percent: Final combined risk probability (0-100)
     """
-    # Load data
+    # Load data (Parquet copies of the inputs when available, otherwise
+    # pyarrow's multithreaded CSV parser; latents as float32)
     print("Loading data...")
-    df_latent = pd.read_csv(latent_path)
-    df_clusters = pd.read_csv(cluster_labels_path)
-    df_physical = pd.read_csv(physical_features_path)
+    # Imported lazily: the Stage 3 clustering module pulls in DuckDB and
+    # sklearn, which merely importing this module should not pay for
+    from stage3_clustering.latent_clustering import load_latent_representations
+    
+    df_latent, latent_vectors = load_latent_representations(latent_path)
+    df_clusters = read_csv_cached(cluster_labels_path)
+    df_physical = read_csv_cached(physical_features_path)
 
     # Ensure meter_id alignment
     meter_ids = df_latent["meter_id"].values
     
-    # Extract latent vectors (all columns except meter_id)
-    z_cols = [col for col in df_latent.columns if col.startswith("z_")]
-    latent_vectors = df_latent[z_cols].values
-    
     # Get cluster labels aligned with latent vectors
-    cluster_map = dict(zip(df_clusters["meter_id"], df_clusters["cluster_label"]))
-    cluster_labels = np.array([cluster_map[mid] for mid in meter_ids])
+    cluster_rows = _align_rows(df_clusters["meter_id"].to_numpy(), meter_ids)
+    cluster_labels = df_clusters["cluster_label"].to_numpy()[cluster_rows]
     
     # Ensure physical features are aligned
-    physical_map = df_physical.set_index("meter_id")
-    df_physical_aligned = physical_map.loc[meter_ids].reset_index()
+    physical_rows = _align_rows(df_physical["meter_id"].to_numpy(), meter_ids)
+    df_physical_aligned = df_physical.iloc[physical_rows].reset_index(drop=True)
+    
+    # Encode cluster labels once for both steps
+    encoded = _encode_clusters(cluster_labels)
+    dense_labels = encoded[1]
     
     # Step 1: Compute intra-cluster anomaly scores
     print("Step 1: Computing intra-cluster anomaly scores...")
     anomaly_scores = compute_intra_cluster_anomaly_scores(
-        latent_vectors, cluster_labels, distance_metric=distance_metric
+        latent_vectors,
+        cluster_labels,
+        distance_metric=distance_metric,
+        cache_dir=(
+            Path(output_path).parent / "cache"
+            if use_cache and output_path is not None
+            else None
+        ),
+        encoded=encoded,
     )
     
     # Step 2: Compute cluster-level degradation
     print("Step 2: Computing cluster-level degradation...")
     cluster_degradation_map = compute_cluster_degradation(
-        df_physical_aligned, cluster_labels, alpha=alpha, beta=beta
+        df_physical_aligned, cluster_labels, alpha=alpha, beta=beta, encoded=encoded
     )
     
-    # Map degradation to each meter
-    cluster_degradation_per_meter = np.array([
-        cluster_degradation_map[cluster_id]
-        for cluster_id in cluster_labels
-    ])
+    # Map degradation to each meter (the index is the sorted unique cluster
+    # ids, so dense labels are positions into it)
+    degradation_values = cluster_degradation_map.to_numpy()
+    cluster_degradation_per_meter = degradation_values[dense_labels]
     
-    # Step 3: Combine individual and cluster risk (base risk)
+    # Step 3: Combine individual and cluster risk (base risk). The w2 weight
+    # is applied to the K cluster values before the gather, and the sum and
+    # percent scaling run in place.
     print("Step 3: Combining anomaly and degradation scores (base risk)...")
-    combined_risk = w1 * anomaly_scores + w2 * cluster_degradation_per_meter
-    
-    # Normalize to [0, 1]
-    risk_min, risk_max = combined_risk.min(), combined_risk.max()
-    if risk_max > risk_min:
-        risk_normalized = (combined_risk - risk_min) / (risk_max - risk_min)
-    else:
-        risk_normalized = np.zeros_like(combined_risk)
+    combined_risk = (w2 * degradation_values)[dense_labels]
+    combined_risk += w1 * anomaly_scores
     
-    risk_percent_base = 100 * risk_normalized
-    
-    # Create base results DataFrame
-    df_results = pd.DataFrame(
-        {
-            "meter_id": meter_ids,
-            "cluster_id": cluster_labels,
-            "anomaly_score": anomaly_scores,
-            "cluster_degradation": cluster_degradation_per_meter,
-            "risk_percent_base": risk_percent_base,
-        }
-    )
+    # Normalize to [0, 1], then to percent
+    risk_percent_base = _minmax_normalize(combined_risk)
+    risk_percent_base *= 100
     
     # Step 4: Optional subcounting integration (Option A)
     if enable_subcounting:
         print("Step 4: Computing subcounting scores and integrating with base risk...")
+        # Imported lazily: only needed when subcounting is enabled
+        from subcounting_detection import SubcountingConfig, compute_subcounting_scores
+        
         # Prepare cluster labels for subcounting (if using cluster peers)
         cluster_df_for_sub = None
         if use_subcount_cluster_peers:
@@ -315,33 +549,43 @@ def compute_risk_scores(
             config=sub_config,
         )
         
-        # Merge subcounting score into results
-        df_results = df_results.merge(
-            df_sub[["meter_id", "subcount_score"]],
-            on="meter_id",
-            how="left",
-        )
-        
-        # Fill missing scores with 0 (no subcounting evidence)
-        df_results["subcount_score"] = df_results["subcount_score"].fillna(0.0)
-        
-        # Convert subcount_score to percentage for display (0-100)
-        df_results["subcount_percent"] = 100.0 * df_results["subcount_score"]
+        # Align subcounting scores with the meters (left join on arrays);
+        # missing scores become 0 (no subcounting evidence)
+        sub_rows = _align_rows(df_sub["meter_id"].to_numpy(), meter_ids, allow_missing=True)
+        has_score = sub_rows >= 0
+        subcount_score = np.zeros(len(meter_ids))
+        subcount_score[has_score] = df_sub["subcount_score"].to_numpy(dtype=np.float64)[sub_rows[has_score]]
+        np.nan_to_num(subcount_score, copy=False, nan=0.0)
         
         # Combine base probability with subcounting probability
-        p_cluster = df_results["risk_percent_base"].values / 100.0
-        p_sub = np.clip(subcount_gamma * df_results["subcount_score"].values, 0.0, 1.0)
+        p_cluster = risk_percent_base / 100.0
+        p_sub = np.clip(subcount_gamma * subcount_score, 0.0, 1.0)
         
         # Option A: independent combination
-        p_final = 1.0 - (1.0 - p_cluster) * (1.0 - p_sub)
-        risk_percent_final = 100.0 * p_final
-        
-        df_results["risk_percent"] = risk_percent_final
+        risk_percent = 100.0 * (1.0 - (1.0 - p_cluster) * (1.0 - p_sub))
     else:
         # No subcounting: keep base risk as final risk
-        df_results["subcount_score"] = 0.0
-        df_results["subcount_percent"] = 0.0
-        df_results["risk_percent"] = df_results["risk_percent_base"]
+        subcount_score = np.zeros(len(meter_ids))
+        risk_percent = risk_percent_base
+    
+    df_results = pd.DataFrame(
+        {
+            "meter_id": meter_ids,
+            "cluster_id": cluster_labels,
+            "anomaly_score": anomaly_scores,
+            "cluster_degradation": cluster_degradation_per_meter,
+            "risk_percent_base": risk_percent_base,
+            "subcount_score": subcount_score,
+            # Percentage for display (0-100)
+            "subcount_percent": 100.0 * subcount_score,
+            "risk_percent": risk_percent,
+        }
+    )
+    
+    # Keep only the top_k meters (partial selection, no full sort)
+    if top_k is not None and top_k < len(df_results):
+        top_rows = np.argpartition(-df_results["risk_percent"].to_numpy(), top_k - 1)[:top_k]
+        df_results = df_results.iloc[top_rows]
     
     # Sort by final risk (highest first)
     df_results = df_results.sort_values("risk_percent", ascending=False).reset_index(drop=True)
@@ -351,7 +595,11 @@ def compute_risk_scores(
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         df_results.to_csv(output_path, index=False)
-        print(f"Results saved to: {output_path}")
+        # Parquet copy written after the CSV so readers see it as current
+        df_results.to_parquet(output_path.with_suffix(".parquet"), index=False, compression="zstd")
+        print(f"Results saved to: {output_path} (+ .parquet)")
     
+    if return_physical:
+        return df_results, df_physical
     return df_results
 
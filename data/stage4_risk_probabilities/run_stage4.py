@@ -9,10 +9,12 @@ Computes failure risk scores (0-100) for each meter based on:
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 from pathlib import Path
 
-import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
 
 # Handle both module import and direct execution
 try:
@@ -173,7 +175,7 @@ def main():
     print("=" * 80)
     
     # Compute risk scores
-    df_results = compute_risk_scores(
+    df_results, df_physical = compute_risk_scores(
         latent_path=args.latent_path,
         cluster_labels_path=args.cluster_path,
         physical_features_path=args.physical_path,
@@ -187,22 +189,25 @@ def main():
         subcount_gamma=args.subcount_gamma,
         use_subcount_cluster_peers=args.subcount_use_cluster_peers,
         subcount_db_path=args.subcount_db_path,
+        return_physical=True,
     )
     
     print(f"\n✓ Risk scores computed for {len(df_results):,} meters")
-    print(f"\n  Base Risk (anomaly + degradation):")
-    print(f"    Range: {df_results['risk_percent_base'].min():.2f}% - {df_results['risk_percent_base'].max():.2f}%")
-    print(f"    Mean: {df_results['risk_percent_base'].mean():.2f}%")
-    print(f"    Median: {df_results['risk_percent_base'].median():.2f}%")
+    
+    # Results are already saved; from here on cluster_id is only grouped
+    # by, so factorize it once for the summary and the plots
+    df_results["cluster_id"] = df_results["cluster_id"].astype("category")
+    sections = [("Base Risk (anomaly + degradation)", "risk_percent_base")]
     if "subcount_percent" in df_results.columns:
-        print(f"\n  Subcounting Probability:")
-        print(f"    Range: {df_results['subcount_percent'].min():.2f}% - {df_results['subcount_percent'].max():.2f}%")
-        print(f"    Mean: {df_results['subcount_percent'].mean():.2f}%")
-        print(f"    Median: {df_results['subcount_percent'].median():.2f}%")
-    print(f"\n  Final Combined Risk:")
-    print(f"    Range: {df_results['risk_percent'].min():.2f}% - {df_results['risk_percent'].max():.2f}%")
-    print(f"    Mean: {df_results['risk_percent'].mean():.2f}%")
-    print(f"    Median: {df_results['risk_percent'].median():.2f}%")
+        sections.append(("Subcounting Probability", "subcount_percent"))
+    sections.append(("Final Combined Risk", "risk_percent"))
+    for title, col in sections:
+        # NaN-skipping NumPy reductions on the raw column (pandas semantics)
+        values = df_results[col].to_numpy(dtype=np.float64)
+        print(f"\n  {title}:")
+        print(f"    Range: {np.nanmin(values):.2f}% - {np.nanmax(values):.2f}%")
+        print(f"    Mean: {np.nanmean(values):.2f}%")
+        print(f"    Median: {np.nanmedian(values):.2f}%")
     
     # Generate summary statistics
     print("\nGenerating summary statistics...")
@@ -216,27 +221,34 @@ def main():
     if not args.no_viz:
         print("\nGenerating visualizations...")
         
-        # Load physical features for visualization
-        df_physical = pd.read_csv(args.physical_path)
-        
-        # Risk distribution by cluster
-        plot_risk_distribution_by_cluster(
-            df_results,
-            output_path=viz_dir / "risk_distribution_by_cluster.png",
-        )
-        
-        # Top risk meters
-        plot_top_risk_meters(
-            df_results,
-            top_percent=args.top_percent,
-            output_path=viz_dir / f"top_{args.top_percent}_percent_risk_meters.png",
-        )
+        # Figures are only written to disk here, never shown. The backend is
+        # selected through the environment (inherited by the worker
+        # processes) so matplotlib is never imported in this process, and
+        # an explicit MPLBACKEND from the caller is respected.
+        os.environ.setdefault("MPLBACKEND", "Agg")
         
-        # Risk vs features
-        plot_risk_vs_features(
-            df_results,
-            df_physical,
-            output_path=viz_dir / "risk_vs_features.png",
+        # The three figures are independent; render them in separate
+        # processes so the Agg rasterisation of each runs concurrently
+        Parallel(n_jobs=3)(
+            [
+                # Risk distribution by cluster
+                delayed(plot_risk_distribution_by_cluster)(
+                    df_results,
+                    output_path=viz_dir / "risk_distribution_by_cluster.png",
+                ),
+                # Top risk meters
+                delayed(plot_top_risk_meters)(
+                    df_results,
+                    top_percent=args.top_percent,
+                    output_path=viz_dir / f"top_{args.top_percent}_percent_risk_meters.png",
+                ),
+                # Risk vs features
+                delayed(plot_risk_vs_features)(
+                    df_results,
+                    df_physical[["meter_id", "age", "canya", "diameter"]],
+                    output_path=viz_dir / "risk_vs_features.png",
+                ),
+            ]
         )
         
         print(f"✓ Visualizations saved to: {viz_dir}")
@@ -4,17 +4,42 @@ Visualization utilities for risk scoring results.
 
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams["figure.dpi"] = 150
+
+@lru_cache(maxsize=None)
+def _ensure_mpl():
+    """
+    Import matplotlib/seaborn on first use and set the plot style.
+
+    Kept out of module import so summary-only callers (run_stage4 --no-viz)
+    don't pay for the plotting stack.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_style("whitegrid")
+    plt.rcParams["figure.dpi"] = 150
+    return plt, sns
+
+
+def _cluster_codes(cluster_id: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return (sorted cluster ids present, dense per-row codes into them).
+
+    A categorical cluster_id is used through its existing codes; any other
+    dtype is factorized with np.unique.
+    """
+    if isinstance(cluster_id.dtype, pd.CategoricalDtype):
+        cat = cluster_id.cat.remove_unused_categories()
+        if cat.cat.categories.is_monotonic_increasing:
+            return cat.cat.categories.to_numpy(), cat.cat.codes.to_numpy()
+    return np.unique(cluster_id.to_numpy(), return_inverse=True)
 
 
 def plot_risk_distribution_by_cluster(
@@ -34,33 +59,49 @@ def plot_risk_distribution_by_cluster(
     figsize : tuple
         Figure size. Default: (14, 8).
     """
+    plt, sns = _ensure_mpl()
     fig, axes = plt.subplots(2, 1, figsize=figsize)
     
+    # Split risk scores per cluster once (stable sort keeps row order
+    # within each cluster) and draw both panels from the same arrays
+    cluster_ids, cluster_codes = _cluster_codes(df_results["cluster_id"])
+    order = np.argsort(cluster_codes, kind="stable")
+    starts = np.searchsorted(cluster_codes[order], np.arange(1, len(cluster_ids)))
+    groups = np.split(df_results["risk_percent"].to_numpy()[order], starts)
+    positions = np.arange(len(cluster_ids))
+    tick_labels = cluster_ids.astype(str)
+    colors = sns.color_palette("Set2", len(cluster_ids))
+    
     # Box plot
-    sns.boxplot(
-        data=df_results,
-        x="cluster_id",
-        y="risk_percent",
-        ax=axes[0],
-        hue="cluster_id",
-        palette="Set2",
-        legend=False,
-    )
+    box = axes[0].boxplot(groups, positions=positions, widths=0.8, patch_artist=True)
+    for patch, color in zip(box["boxes"], colors):
+        patch.set_facecolor(color)
+    for median in box["medians"]:
+        median.set_color("black")
+    axes[0].set_xticks(positions)
+    axes[0].set_xticklabels(tick_labels)
     axes[0].set_title("Risk Score Distribution by Cluster (Box Plot)", fontsize=14, fontweight="bold")
     axes[0].set_xlabel("Cluster ID", fontsize=12)
     axes[0].set_ylabel("Risk Score (%)", fontsize=12)
     axes[0].grid(True, alpha=0.3)
     
     # Violin plot
-    sns.violinplot(
-        data=df_results,
-        x="cluster_id",
-        y="risk_percent",
-        ax=axes[1],
-        hue="cluster_id",
-        palette="Set2",
-        legend=False,
+    # Fixed KDE bandwidth factor (no per-cluster Scott's rule estimate);
+    # matplotlib already evaluates each KDE only over its data range
+    violin = axes[1].violinplot(
+        groups, positions=positions, widths=0.8, showmedians=True, bw_method=0.3
     )
+    # One violin body per cluster; rasterize them so the saved figure
+    # carries bitmaps instead of the full KDE outlines
+    for body, color in zip(violin["bodies"], colors):
+        body.set_facecolor(color)
+        body.set_edgecolor("black")
+        body.set_alpha(0.8)
+        body.set_rasterized(True)
+    for part in ("cbars", "cmins", "cmaxes", "cmedians"):
+        violin[part].set_color("black")
+    axes[1].set_xticks(positions)
+    axes[1].set_xticklabels(tick_labels)
     axes[1].set_title("Risk Score Distribution by Cluster (Violin Plot)", fontsize=14, fontweight="bold")
     axes[1].set_xlabel("Cluster ID", fontsize=12)
     axes[1].set_ylabel("Risk Score (%)", fontsize=12)
@@ -71,7 +112,7 @@ def plot_risk_distribution_by_cluster(
     if output_path:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(output_path, bbox_inches="tight", dpi=150)
+        plt.savefig(output_path, bbox_inches="tight", dpi=100)
         print(f"Saved plot to: {output_path}")
     else:
         plt.show()
@@ -99,23 +140,31 @@ def plot_top_risk_meters(
     figsize : tuple
         Figure size. Default: (14, 8).
     """
+    # Select the n_top highest risks with an O(N) partition rather than
+    # relying on df_results being sorted by risk
+    risk = df_results["risk_percent"].to_numpy()
     n_top = int(len(df_results) * top_percent / 100)
-    top_meters = df_results.head(n_top)
+    kth = len(risk) - n_top
+    top_idx = np.argpartition(risk, kth)[kth:] if n_top > 0 else np.empty(0, dtype=np.intp)
+    top_meters = df_results.iloc[np.sort(top_idx)]
     
+    plt, _ = _ensure_mpl()
     fig, axes = plt.subplots(2, 1, figsize=figsize)
     
-    # Overall distribution with top meters highlighted
+    # Overall distribution with top meters highlighted (shared bin edges so
+    # the highlighted bars line up with the full distribution)
+    edges = np.histogram_bin_edges(risk, bins=50)
     axes[0].hist(
-        df_results["risk_percent"],
-        bins=50,
+        risk,
+        bins=edges,
         alpha=0.6,
         color="lightblue",
         edgecolor="black",
         label="All meters",
     )
     axes[0].hist(
-        top_meters["risk_percent"],
-        bins=50,
+        risk[top_idx],
+        bins=edges,
         alpha=0.8,
         color="red",
         edgecolor="black",
@@ -135,16 +184,16 @@ def plot_top_risk_meters(
     axes[0].grid(True, alpha=0.3)
     
     # Top meters by cluster
-    cluster_counts = top_meters["cluster_id"].value_counts().sort_index()
-    cluster_counts_all = df_results["cluster_id"].value_counts().sort_index()
-    
-    # Ensure we have all clusters (fill missing with 0)
-    cluster_counts = cluster_counts.reindex(cluster_counts_all.index, fill_value=0)
-    cluster_pct = (cluster_counts / cluster_counts_all * 100).fillna(0)
+    # Dense cluster codes (ids may be sparse or include -1 noise) so both
+    # counts are plain bincounts; clusters absent from the top get 0
+    cluster_ids, cluster_codes = _cluster_codes(df_results["cluster_id"])
+    cluster_counts_all = np.bincount(cluster_codes, minlength=len(cluster_ids))
+    cluster_counts = np.bincount(cluster_codes[top_idx], minlength=len(cluster_ids))
+    cluster_pct = cluster_counts / cluster_counts_all * 100
     
     bars = axes[1].bar(
-        cluster_counts_all.index.astype(str),
-        cluster_pct.values,
+        cluster_ids.astype(str),
+        cluster_pct,
         color="coral",
         edgecolor="black",
         alpha=0.8,
@@ -171,7 +220,7 @@ def plot_top_risk_meters(
     if output_path:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(output_path, bbox_inches="tight", dpi=150)
+        plt.savefig(output_path, bbox_inches="tight", dpi=100)
         print(f"Saved plot to: {output_path}")
     else:
         plt.show()
@@ -181,7 +230,7 @@ def plot_top_risk_meters(
 
 def plot_risk_vs_features(
     df_results: pd.DataFrame,
-    df_physical: pd.DataFrame,
+    df_physical: Optional[pd.DataFrame] = None,
     output_path: Optional[str | Path] = None,
     figsize: tuple[int, int] = (16, 10),
 ) -> None:
@@ -191,56 +240,72 @@ def plot_risk_vs_features(
     Parameters
     ----------
     df_results : pd.DataFrame
-        DataFrame with columns: meter_id, risk_percent.
-    df_physical : pd.DataFrame
-        DataFrame with columns: meter_id, age, canya, diameter.
+        DataFrame with columns: meter_id, risk_percent (and optionally
+        age, canya, diameter).
+    df_physical : pd.DataFrame, optional
+        DataFrame with columns: meter_id, age, canya, diameter. Only needed
+        when df_results does not already carry those columns.
     output_path : str | Path, optional
         Path to save figure. If None, displays plot.
     figsize : tuple
         Figure size. Default: (16, 10).
     """
-    # Merge data
-    df_merged = df_results.merge(
-        df_physical[["meter_id", "age", "canya", "diameter"]],
-        on="meter_id",
-        how="left",
-    )
+    feature_cols = ["age", "canya", "diameter"]
+    if set(feature_cols).issubset(df_results.columns):
+        df_merged = df_results
+    elif df_physical is None:
+        raise ValueError("df_physical is required when df_results lacks age, canya and diameter")
+    else:
+        # Attach physical features through an index lookup on meter_id
+        # (string ids, so no integer key encoding is possible)
+        df_merged = df_results.join(
+            df_physical.set_index("meter_id")[feature_cols],
+            on="meter_id",
+            how="left",
+        )
     
+    plt, _ = _ensure_mpl()
     fig, axes = plt.subplots(2, 2, figsize=figsize)
     axes = axes.flatten()
     
-    # Risk vs Age
-    axes[0].scatter(
+    # Risk vs Age (hexbin density: one binned image instead of a marker
+    # per meter)
+    hb_age = axes[0].hexbin(
         df_merged["age"],
         df_merged["risk_percent"],
-        alpha=0.5,
-        s=20,
-        color="steelblue",
+        gridsize=60,
+        cmap="Blues",
+        mincnt=1,
+        bins="log",
+        rasterized=True,
     )
+    fig.colorbar(hb_age, ax=axes[0], label="Number of meters (log)")
     axes[0].set_xlabel("Age (years)", fontsize=12)
     axes[0].set_ylabel("Risk Score (%)", fontsize=12)
     axes[0].set_title("Risk Score vs Age", fontsize=13, fontweight="bold")
     axes[0].grid(True, alpha=0.3)
     
     # Risk vs Canya
-    axes[1].scatter(
+    hb_canya = axes[1].hexbin(
         df_merged["canya"],
         df_merged["risk_percent"],
-        alpha=0.5,
-        s=20,
-        color="coral",
+        gridsize=60,
+        cmap="Oranges",
+        mincnt=1,
+        bins="log",
+        rasterized=True,
     )
+    fig.colorbar(hb_canya, ax=axes[1], label="Number of meters (log)")
     axes[1].set_xlabel("Canya", fontsize=12)
     axes[1].set_ylabel("Risk Score (%)", fontsize=12)
     axes[1].set_title("Risk Score vs Canya", fontsize=13, fontweight="bold")
     axes[1].grid(True, alpha=0.3)
     
     # Risk vs Diameter
-    diameter_counts = df_merged["diameter"].value_counts().sort_index()
-    diameter_risk = df_merged.groupby("diameter")["risk_percent"].mean().sort_index()
+    diameter_risk = df_merged.groupby("diameter")["risk_percent"].mean()
     
     axes[2].bar(
-        diameter_counts.index.astype(str),
+        diameter_risk.index.astype(str),
         diameter_risk.values,
         color="mediumseagreen",
         edgecolor="black",
@@ -252,19 +317,21 @@ def plot_risk_vs_features(
     axes[2].grid(True, alpha=0.3, axis="y")
     
     # Risk distribution histogram
+    risk = df_merged["risk_percent"].to_numpy()
+    risk_median = float(np.nanmedian(risk))
     axes[3].hist(
-        df_merged["risk_percent"],
+        risk,
         bins=50,
         color="purple",
         alpha=0.7,
         edgecolor="black",
     )
     axes[3].axvline(
-        df_merged["risk_percent"].median(),
+        risk_median,
         color="red",
         linestyle="--",
         linewidth=2,
-        label=f"Median: {df_merged['risk_percent'].median():.2f}%",
+        label=f"Median: {risk_median:.2f}%",
     )
     axes[3].set_xlabel("Risk Score (%)", fontsize=12)
     axes[3].set_ylabel("Number of Meters", fontsize=12)
@@ -277,7 +344,7 @@ def plot_risk_vs_features(
     if output_path:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        plt.savefig(output_path, bbox_inches="tight", dpi=150)
+        plt.savefig(output_path, bbox_inches="tight", dpi=100)
         print(f"Saved plot to: {output_path}")
     else:
         plt.show()
@@ -297,47 +364,62 @@ def generate_summary_statistics(
     df_results : pd.DataFrame
         DataFrame with columns: meter_id, cluster_id, anomaly_score, cluster_degradation, risk_percent.
     output_path : str | Path, optional
-        Path to save summary CSV. If None, returns DataFrame only.
+        Path to save summary CSV (plus a .parquet copy). If None, returns
+        DataFrame only.
 
     Returns
     -------
     pd.DataFrame
         Summary statistics by cluster.
     """
-    # Build aggregation dictionary based on available columns
-    agg_dict = {
-        "meter_id": "count",
-        "risk_percent": ["mean", "std", "min", "max", "median"],
-        "anomaly_score": ["mean", "std"],
-        "cluster_degradation": "first",  # Same for all meters in cluster
-    }
-    
-    # Add base risk and subcounting if available
-    if "risk_percent_base" in df_results.columns:
-        agg_dict["risk_percent_base"] = ["mean", "std", "min", "max", "median"]
-    if "subcount_percent" in df_results.columns:
-        agg_dict["subcount_percent"] = ["mean", "std", "min", "max", "median"]
-    
-    summary = df_results.groupby("cluster_id").agg(agg_dict).round(4)
-    
-    # Flatten column names
-    col_names = ["n_meters", "risk_mean", "risk_std", "risk_min", "risk_max", "risk_median"]
-    if "risk_percent_base" in agg_dict:
-        col_names.extend(["risk_base_mean", "risk_base_std", "risk_base_min", "risk_base_max", "risk_base_median"])
-    if "subcount_percent" in agg_dict:
-        col_names.extend(["subcount_mean", "subcount_std", "subcount_min", "subcount_max", "subcount_median"])
-    col_names.extend(["anomaly_mean", "anomaly_std", "cluster_degradation"])
+    # Risk columns summarised per cluster (base risk and subcounting only
+    # when available), in output order
+    risk_columns = [
+        (col, prefix)
+        for col, prefix in (
+            ("risk_percent", "risk"),
+            ("risk_percent_base", "risk_base"),
+            ("subcount_percent", "subcount"),
+        )
+        if col in df_results.columns
+    ]
+    risk_aggs = "".join(
+        f""",
+            AVG({col}) AS {prefix}_mean,
+            STDDEV_SAMP({col}) AS {prefix}_std,
+            MIN({col}) AS {prefix}_min,
+            MAX({col}) AS {prefix}_max,
+            MEDIAN({col}) AS {prefix}_median"""
+        for col, prefix in risk_columns
+    )
     
-    summary.columns = col_names
+    # All per-cluster aggregates in one DuckDB pass (imported here so the
+    # plotting-only paths and module import stay free of DuckDB)
+    import duckdb
     
-    summary = summary.reset_index()
-    summary = summary.sort_values("risk_mean", ascending=False)
+    con = duckdb.connect()
+    con.register("results", df_results)
+    summary = con.execute(f"""
+        SELECT
+            cluster_id,
+            COUNT(meter_id) AS n_meters{risk_aggs},
+            AVG(anomaly_score) AS anomaly_mean,
+            STDDEV_SAMP(anomaly_score) AS anomaly_std,
+            -- Same for all meters in cluster
+            FIRST(cluster_degradation) AS cluster_degradation
+        FROM results
+        GROUP BY cluster_id
+        ORDER BY risk_mean DESC
+    """).df()
+    con.close()
+    summary = summary.round(4)
     
     if output_path:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         summary.to_csv(output_path, index=False)
-        print(f"Summary statistics saved to: {output_path}")
+        summary.to_parquet(output_path.with_suffix(".parquet"), index=False, compression="zstd")
+        print(f"Summary statistics saved to: {output_path} (+ .parquet)")
     
     return summary
 
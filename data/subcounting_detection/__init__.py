@@ -10,6 +10,7 @@ from .subcounting_detection import (
     compute_subcounting_metrics,
     compute_subcounting_scores,
     load_consumption_data,
+    load_monthly_consumption,
 )
 
 __all__ = [
@@ -17,6 +18,7 @@ __all__ = [
     "compute_subcounting_metrics",
     "compute_subcounting_scores",
     "load_consumption_data",
+    "load_monthly_consumption",
 ]
 
 
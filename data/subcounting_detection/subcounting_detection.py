@@ -29,6 +29,14 @@ import pandas as pd
 
 DEFAULT_DB_PATH = Path(__file__).resolve().parents[1] / "analytics.duckdb"
 
+# Pandas offset aliases that DuckDB's date_trunc reproduces exactly
+# (period start: first day of the month / Monday of the week)
+_SQL_TRUNC_PARTS = {"M": "month", "W": "week"}
+
+# Pandas offset aliases whose period start is a plain datetime64 unit
+# truncation. Not 'W': NumPy weeks are counted from 1970-01-01, a Thursday
+_NUMPY_TRUNC_UNITS = {"D": "D", "M": "M", "Y": "Y"}
+
 
 @dataclass
 class SubcountingConfig:
@@ -98,6 +106,91 @@ def load_consumption_data(
     return df
 
 
+def _monthly_table_is_current(con: duckdb.DuckDBPyConnection) -> bool:
+    """
+    True if the database holds a monthly_consumption table built from the
+    consumption parquet as it is now (same size and mtime).
+    """
+    try:
+        row = con.execute(
+            "SELECT parquet_path, size, mtime_ns FROM monthly_consumption_source"
+        ).fetchone()
+    except duckdb.CatalogException:
+        return False
+    if row is None:
+        return False
+    try:
+        stat = Path(row[0]).stat()
+    except OSError:
+        return False
+    return (stat.st_size, stat.st_mtime_ns) == (row[1], row[2])
+
+
+def load_monthly_consumption(
+    db_path: str | Path = DEFAULT_DB_PATH,
+    freq: str = "M",
+) -> pd.DataFrame:
+    """
+    Load per-meter consumption for domestic meters, already aggregated.
+
+    For monthly ('M') and weekly ('W') periods the aggregation runs inside
+    DuckDB, so only one row per meter and period leaves the database; monthly
+    data is read from the pre-aggregated monthly_consumption table when it is
+    up to date. Other frequencies fall back to loading daily rows and
+    aggregating in pandas.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns: meter_id, period, consumo (sorted by meter_id, period)
+    """
+    part = _SQL_TRUNC_PARTS.get(freq)
+    if part is None:
+        return _aggregate_monthly_consumption(load_consumption_data(db_path), freq=freq)
+
+    path = Path(db_path)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"DuckDB database not found at {path}. "
+            "Run data/create_database.py to generate analytics.duckdb."
+        )
+
+    con = duckdb.connect(database=str(path), read_only=True)
+
+    if part == "month" and _monthly_table_is_current(con):
+        # Pre-aggregated by create_database.py
+        sql = "SELECT meter_id, period, consumo FROM monthly_consumption ORDER BY 1, 2"
+    else:
+        sql = f"""
+            SELECT
+                cd."POLIZA_SUMINISTRO"::VARCHAR AS meter_id,
+                date_trunc('{part}', CAST(cd.FECHA AS DATE)) AS period,
+                CAST(COALESCE(SUM(cd.CONSUMO_REAL), 0) AS BIGINT) AS consumo
+            FROM consumption_data cd
+            JOIN counter_metadata cm
+                ON cd."POLIZA_SUMINISTRO" = cm."POLIZA_SUMINISTRO"
+            WHERE cm.US_AIGUA_GEST = 'D'
+                AND cd.FECHA IS NOT NULL
+            GROUP BY 1, 2
+            ORDER BY 1, 2
+        """
+
+    # Fetch through Arrow: converting the Arrow table is cheaper than
+    # DuckDB's own DataFrame conversion. .arrow() returns a Table on older
+    # DuckDB releases and a RecordBatchReader on newer ones
+    result = con.execute(sql).arrow()
+    table = result.read_all() if hasattr(result, "read_all") else result
+    con.close()
+    df = table.to_pandas()
+
+    if df.empty:
+        raise ValueError("No domestic consumption data found in consumption_data view.")
+
+    df["period"] = pd.to_datetime(df["period"]).astype("datetime64[ns]")
+
+    return df
+
+
 def _aggregate_monthly_consumption(
     df: pd.DataFrame,
     freq: str = "M",
@@ -117,13 +210,20 @@ def _aggregate_monthly_consumption(
     pd.DataFrame
         Columns: meter_id, period, consumo
     """
-    df = df.copy()
-    df["period"] = df["date"].dt.to_period(freq).dt.to_timestamp()
+    # Period keys are passed to groupby directly rather than added as a
+    # column, so the daily frame is neither copied nor modified
+    unit = _NUMPY_TRUNC_UNITS.get(freq)
+    if unit is not None:
+        truncated = df["date"].to_numpy().astype(f"datetime64[{unit}]").astype("datetime64[ns]")
+        period = pd.Series(truncated, index=df.index, name="period")
+    else:
+        period = df["date"].dt.to_period(freq).dt.to_timestamp().rename("period")
 
     agg = (
-        df.groupby(["meter_id", "period"], as_index=False)["consumo_real"]
+        df.groupby([df["meter_id"], period])["consumo_real"]
         .sum()
-        .rename(columns={"consumo_real": "consumo"})
+        .rename("consumo")
+        .reset_index()
     )
 
     return agg
@@ -151,28 +251,20 @@ def _compute_peer_normalisation(
     pd.DataFrame
         Columns: meter_id, period, consumo, peer_median, x_norm
     """
-    df = df_monthly.copy()
-
+    # Peer medians are broadcast back onto the rows with a grouped transform
+    # (no separate median table to merge back); rows whose cluster is
+    # missing get NaN, as groupby drops NaN keys. The merge already returns
+    # a new frame, so df_monthly itself is only copied in the global case
     if cluster_labels is not None:
-        df = df.merge(cluster_labels, on="meter_id", how="left")
+        df = df_monthly.merge(cluster_labels, on="meter_id", how="left")
         if "cluster_label" not in df.columns:
             raise ValueError("cluster_labels must contain 'meter_id' and 'cluster_label' columns.")
 
-        peer = (
-            df.groupby(["cluster_label", "period"])["consumo"]
-            .median()
-            .rename("peer_median")
-            .reset_index()
-        )
-        df = df.merge(peer, on=["cluster_label", "period"], how="left")
+        df["peer_median"] = df.groupby(["cluster_label", "period"])["consumo"].transform("median")
     else:
-        peer = (
-            df.groupby("period")["consumo"]
-            .median()
-            .rename("peer_median")
-            .reset_index()
+        df = df_monthly.assign(
+            peer_median=df_monthly.groupby("period")["consumo"].transform("median")
         )
-        df = df.merge(peer, on="period", how="left")
 
     eps = 1e-6
     df["x_norm"] = df["consumo"] / (df["peer_median"] + eps)
@@ -180,129 +272,195 @@ def _compute_peer_normalisation(
     return df
 
 
-def _compute_long_term_drop_ratio(
-    series: pd.Series,
-    min_points: int,
-    baseline_window: int,
-    recent_window: int,
-) -> float:
+def _series_matrix(
+    values: np.ndarray,
+    starts: np.ndarray,
+    counts: np.ndarray,
+) -> np.ndarray:
     """
-    Compute long-term drop ratio R = mean_recent / mean_baseline.
-    """
-    if len(series) < min_points:
-        return 1.0
-
-    recent = series.iloc[-recent_window:]
-    baseline = series.iloc[max(0, len(series) - recent_window - baseline_window) : -recent_window]
-
-    if len(baseline) == 0:
-        return 1.0
-
-    mean_recent = recent.mean()
-    mean_baseline = baseline.mean()
-
-    if mean_baseline <= 0:
-        return 1.0
+    Lay out consecutive per-meter series as rows of a NaN-padded matrix.
 
-    return float(mean_recent / mean_baseline)
+    Row g holds meter g's values right-aligned, in columns
+    [width - counts[g], width), so "the last k periods" is the same column
+    range for every meter.
+    """
+    width = int(counts.max()) if len(counts) else 0
+    rows = np.repeat(np.arange(len(counts)), counts)
+    cols = width - counts[rows] + (np.arange(len(values)) - starts[rows])
+    matrix = np.full((len(counts), width), np.nan)
+    matrix[rows, cols] = values
+    return matrix
 
 
-def _compute_trend_slope(series: pd.Series) -> float:
+def _window_mask(lo: np.ndarray, hi: np.ndarray, width: int) -> np.ndarray:
     """
-    Compute linear trend slope on a time-indexed series.
-    Returns the slope (change per period).
+    Boolean (rows, width) mask selecting columns [lo[g], hi[g]) in row g.
     """
-    if len(series) < 3:
-        return 0.0
+    cols = np.arange(width)
+    return (cols >= lo[:, None]) & (cols < hi[:, None])
 
-    y = series.values.astype(float)
-    x = np.arange(len(y), dtype=float)
-    x_mean = x.mean()
-    y_mean = y.mean()
 
-    denom = np.sum((x - x_mean) ** 2)
-    if denom <= 0:
-        return 0.0
+def _window_nanmean(matrix: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Per-row mean of matrix[g, lo[g]:hi[g]], skipping NaNs like Series.mean().
 
-    slope = float(np.sum((x - x_mean) * (y - y_mean)) / denom)
-    return slope
+    Rows with no non-NaN value in the window get NaN.
+    """
+    mask = _window_mask(lo, hi, matrix.shape[1]) & ~np.isnan(matrix)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(mask, matrix, 0.0).sum(axis=1) / mask.sum(axis=1)
 
 
-def _compute_slope_change(series: pd.Series) -> float:
+def _window_slopes(matrix: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
     """
-    Compute relative slope change between first and second half of the series.
+    Per-row least-squares slope of matrix[g, lo[g]:hi[g]] against 0..n-1.
 
-    Returns
-    -------
-    float
-        Ratio s_second / s_first. Values < 1 indicate a slowdown.
+    Windows with fewer than 3 points get 0.0; a NaN inside a window makes
+    that row's slope NaN.
+    """
+    width = matrix.shape[1]
+    n = hi - lo
+    y = np.where(_window_mask(lo, hi, width), matrix, 0.0)
+
+    # Single pass over the data for the sufficient statistics sum(y) and
+    # sum(x*y), with x = 0..n-1 local to the window (x*y via one
+    # matrix-vector product on the column index, shifted by lo). sum(x) and
+    # sum(x^2) are closed form for x = 0..n-1, so
+    #   slope = (n*sum(xy) - sum(x)*sum(y)) / (n*sum(x^2) - sum(x)^2)
+    # with denominator n^2 (n^2 - 1) / 12.
+    sum_y = y.sum(axis=1)
+    sum_xy = y @ np.arange(width, dtype=np.float64) - lo * sum_y
+    sum_x = n * (n - 1) / 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * sum_xy - sum_x * sum_y) / (n * n * (n * n - 1) / 12)
+    return np.where(n >= 3, slope, 0.0)
+
+
+def _series_medians(matrix: np.ndarray, counts: np.ndarray) -> np.ndarray:
     """
-    n = len(series)
-    if n < 6:
-        return 1.0
+    Per-row median of the counts[g] right-aligned values of matrix row g.
 
-    mid = n // 2
-    first = series.iloc[:mid]
-    second = series.iloc[mid:]
+    Like np.median, a NaN inside the series makes that row's median NaN.
+    """
+    width = matrix.shape[1]
+    first = width - counts
+    has_nan = (np.isnan(matrix) & (np.arange(width) >= first[:, None])).any(axis=1)
+
+    # Sorting moves the padding (and any NaN) past the counts[g] values
+    ordered = np.sort(matrix, axis=1)
+    rows = np.arange(len(counts))
+    lower = ordered[rows, np.maximum(counts - 1, 0) // 2]
+    upper = ordered[rows, np.minimum(counts // 2, max(width - 1, 0))]
+    return np.where(has_nan, np.nan, (lower + upper) / 2)
+
+
+def _compute_series_metrics(
+    values: np.ndarray,
+    starts: np.ndarray,
+    counts: np.ndarray,
+    config: SubcountingConfig,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute drop ratio R, trend slope, slope change and median level for
+    every meter.
+
+    values holds each meter's normalised series contiguously, in period
+    order, starting at starts[g] with counts[g] points.
+
+    - R = mean_recent / mean_baseline over the last recent_window periods
+      and the baseline_window periods before them (1.0 when the series is
+      shorter than min_months, there is no baseline, or its mean is <= 0).
+    - slope: linear trend per period over the whole series (0.0 below 3
+      points).
+    - delta_s = s_second / s_first, the slopes of the two halves (1.0 below
+      6 points or when |s_first| < 1e-6). Values < 1 indicate a slowdown.
+    - level: median of the series, used to make the slope scale-invariant.
+    """
+    matrix = _series_matrix(values, starts, counts)
+    width = matrix.shape[1]
+    first = width - counts
+    end = np.full_like(counts, width)
+
+    # Long-term drop ratio
+    recent_window = config.recent_window
+    recent_lo = np.maximum(first, width - recent_window)
+    baseline_lo = np.maximum(first, width - recent_window - config.baseline_window)
+    baseline_hi = width - recent_window
+    has_baseline = (baseline_hi > baseline_lo) & (recent_window > 0)
+    mean_recent = _window_nanmean(matrix, recent_lo, end)
+    mean_baseline = _window_nanmean(matrix, baseline_lo, np.full_like(counts, baseline_hi))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        R = np.where(
+            (counts < config.min_months) | ~has_baseline | (mean_baseline <= 0),
+            1.0,
+            mean_recent / mean_baseline,
+        )
 
-    s_first = _compute_trend_slope(first)
-    s_second = _compute_trend_slope(second)
+    # Linear trend over the whole series
+    slope = _window_slopes(matrix, first, end)
+
+    # Slope change between first and second half
+    mid = first + counts // 2
+    s_first = _window_slopes(matrix, first, mid)
+    s_second = _window_slopes(matrix, mid, end)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta_s = np.where(
+            (counts < 6) | (np.abs(s_first) < 1e-6),
+            1.0,
+            s_second / s_first,
+        )
 
-    if abs(s_first) < 1e-6:
-        return 1.0
+    level = _series_medians(matrix, counts)
 
-    return float(s_second / s_first)
+    return R, slope, delta_s, level
 
 
-def _score_from_ratio(R: float) -> float:
+def _score_from_ratio(R: np.ndarray) -> np.ndarray:
     """
-    Map drop ratio R to sub-score s_R in [0, 1].
+    Map drop ratios R to sub-scores s_R in [0, 1].
+
+    1 at R <= 0.5, 0 at R >= 0.8, linear in between; NaN stays NaN.
     """
-    if R <= 0.5:
-        return 1.0
-    if R >= 0.8:
-        return 0.0
-    return float((0.8 - R) / (0.8 - 0.5))
+    return np.clip((0.8 - R) / (0.8 - 0.5), 0.0, 1.0)
 
 
-def _score_from_slope(slope: float, series: pd.Series) -> float:
+def _score_from_slope(
+    slope: np.ndarray,
+    median_level: np.ndarray,
+    counts: np.ndarray,
+) -> np.ndarray:
     """
-    Map trend slope to sub-score s_T in [0, 1].
+    Map trend slopes to sub-scores s_T in [0, 1].
 
     We normalise the slope by the median level of the series to make it
-    approximately scale-invariant.
+    approximately scale-invariant. Series shorter than 6 periods or with a
+    non-positive median level score 0.
     """
-    if len(series) < 6:
-        return 0.0
-
-    median_level = np.median(series.values)
-    if median_level <= 0:
-        return 0.0
-
     # Normalised slope: relative change per period
-    rel_slope = slope / median_level
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rel_slope = slope / median_level
 
     # Heuristic thresholds (tunable):
     #   rel_slope <= -0.05 -> strong negative trend  (score 1)
     #   rel_slope >= 0     -> no negative trend      (score 0)
-    if rel_slope >= 0:
-        return 0.0
-    if rel_slope <= -0.05:
-        return 1.0
-
-    # Linear interpolation between 0 and -0.05
-    return float((-rel_slope) / 0.05)
+    # with linear interpolation between 0 and -0.05
+    s_T = np.clip(-rel_slope / 0.05, 0.0, 1.0)
+    return np.where((counts < 6) | (median_level <= 0), 0.0, s_T)
 
 
-def _score_from_slope_change(delta_s: float) -> float:
+def _score_from_slope_change(delta_s: np.ndarray) -> np.ndarray:
     """
-    Map slope ratio s_second / s_first to sub-score s_delta in [0, 1].
+    Map slope ratios s_second / s_first to sub-scores s_delta in [0, 1].
+
+    1 at delta_s <= 0.5, 0 at delta_s >= 0.8, linear in between.
     """
-    if delta_s <= 0.5:
-        return 1.0
-    if delta_s >= 0.8:
-        return 0.0
-    return float((0.8 - delta_s) / (0.8 - 0.5))
+    return np.clip((0.8 - delta_s) / (0.8 - 0.5), 0.0, 1.0)
+
+
+def _is_sorted_by_meter_period(meter_ids: np.ndarray, periods: np.ndarray) -> bool:
+    """Whether rows are already ordered by (meter_id, period), in one O(N) pass."""
+    same = meter_ids[1:] == meter_ids[:-1]
+    return bool(np.all((meter_ids[1:] > meter_ids[:-1]) | (same & (periods[1:] >= periods[:-1]))))
 
 
 def compute_subcounting_metrics(
@@ -334,64 +492,84 @@ def compute_subcounting_metrics(
     if config is None:
         config = SubcountingConfig()
 
-    records = []
-
-    grouped = df_monthly_norm.sort_values(["meter_id", "period"]).groupby("meter_id")
-
-    for meter_id, grp in grouped:
-        x = grp["x_norm"]
-        n = len(x)
-
-        R = _compute_long_term_drop_ratio(
-            x,
-            min_points=config.min_months,
-            baseline_window=config.baseline_window,
-            recent_window=config.recent_window,
+    # Flat layout: every meter's series contiguous in period order, located
+    # by its start offset and length. load_monthly_consumption already
+    # returns rows in (meter_id, period) order and the peer normalisation
+    # keeps it, so the full sort only runs for input arriving unordered.
+    # Columns are taken as NumPy arrays up front, without filtering or
+    # sorting a copy of the whole frame
+    meter_ids = df_monthly_norm["meter_id"].to_numpy()
+    periods = df_monthly_norm["period"].to_numpy()
+    values = df_monthly_norm["x_norm"].to_numpy(dtype=np.float64)
+    keep = pd.notna(meter_ids)
+    if not keep.all():
+        meter_ids, periods, values = meter_ids[keep], periods[keep], values[keep]
+    if not _is_sorted_by_meter_period(meter_ids, periods):
+        ordered = df_monthly_norm.loc[keep, ["meter_id", "period", "x_norm"]].sort_values(
+            ["meter_id", "period"]
         )
-        slope = _compute_trend_slope(x)
-        delta_s = _compute_slope_change(x)
-
-        s_R = _score_from_ratio(R)
-        s_T = _score_from_slope(slope, x)
-        s_delta = _score_from_slope_change(delta_s)
+        meter_ids = ordered["meter_id"].to_numpy()
+        values = ordered["x_norm"].to_numpy(dtype=np.float64)
+    if len(values):
+        starts = np.flatnonzero(np.r_[True, meter_ids[1:] != meter_ids[:-1]])
+    else:
+        starts = np.empty(0, dtype=np.intp)
+    counts = np.diff(np.r_[starts, len(values)])
 
-        subcount_score = (
-            config.w_ratio * s_R
-            + config.w_trend * s_T
-            + config.w_slope_change * s_delta
-        )
+    all_R, all_slope, all_delta_s, all_level = _compute_series_metrics(
+        values, starts, counts, config
+    )
+    all_s_R = _score_from_ratio(all_R)
+    all_s_T = _score_from_slope(all_slope, all_level, counts)
+    all_s_delta = _score_from_slope_change(all_delta_s)
+
+    all_raw = (
+        config.w_ratio * all_s_R
+        + config.w_trend * all_s_T
+        + config.w_slope_change * all_s_delta
+    )
 
-        # Simple logical reinforcement:
-        strong_signals = sum(score > 0.7 for score in (s_R, s_T, s_delta))
-        if strong_signals >= 2:
-            subcount_score = max(subcount_score, 0.7)
-
-        records.append(
-            {
-                "meter_id": meter_id,
-                "n_periods": n,
-                "R": R,
-                "slope": slope,
-                "delta_s": delta_s,
-                "s_R": s_R,
-                "s_T": s_T,
-                "s_delta": s_delta,
-                "subcount_score_raw": subcount_score,
-            }
-        )
+    # Simple logical reinforcement: at least two strong sub-scores lift the
+    # raw score to 0.7 (np.maximum keeps a NaN score NaN, like max()).
+    # Boolean masks are counted through uint8 views, without casting copies
+    strong_signals = (
+        (all_s_R > 0.7).view(np.uint8)
+        + (all_s_T > 0.7).view(np.uint8)
+        + (all_s_delta > 0.7).view(np.uint8)
+    )
+    all_raw = np.where(strong_signals >= 2, np.maximum(all_raw, 0.7), all_raw)
 
-    df_metrics = pd.DataFrame(records)
+    if not len(starts):
+        df_metrics = pd.DataFrame()
+        df_metrics["subcount_score"] = []
+        return df_metrics
+
+    df_metrics = pd.DataFrame(
+        {
+            "meter_id": meter_ids[starts],
+            "n_periods": counts,
+            "R": all_R,
+            "slope": all_slope,
+            "delta_s": all_delta_s,
+            "s_R": all_s_R,
+            "s_T": all_s_T,
+            "s_delta": all_s_delta,
+            "subcount_score_raw": all_raw,
+        }
+    )
 
     # Normalise raw subcount_score to [0, 1] across meters for comparability
-    if not df_metrics.empty:
-        vals = df_metrics["subcount_score_raw"].values
-        v_min, v_max = vals.min(), vals.max()
-        if v_max > v_min:
-            df_metrics["subcount_score"] = (vals - v_min) / (v_max - v_min)
-        else:
-            df_metrics["subcount_score"] = 0.0
+    # (a NaN raw score makes the span NaN, and every score 0)
+
+    vals = df_metrics["subcount_score_raw"].to_numpy()
+    lo = vals.min()
+    span = vals.max() - lo
+    if span > 0:
+        scaled = vals - lo
+        scaled /= span
+        df_metrics["subcount_score"] = scaled
     else:
-        df_metrics["subcount_score"] = []
+        df_metrics["subcount_score"] = 0.0
 
     return df_metrics
 
@@ -422,8 +600,7 @@ def compute_subcounting_scores(
     if config is None:
         config = SubcountingConfig()
 
-    df_daily = load_consumption_data(db_path=db_path)
-    df_monthly = _aggregate_monthly_consumption(df_daily, freq=config.freq)
+    df_monthly = load_monthly_consumption(db_path=db_path, freq=config.freq)
 
     if config.use_cluster_peers and cluster_labels is not None:
         df_monthly_norm = _compute_peer_normalisation(df_monthly, cluster_labels=cluster_labels)
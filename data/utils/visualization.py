@@ -4,19 +4,57 @@ Visualization utilities for clusters, reconstructions, and latent space.
 
 from __future__ import annotations
 
+import hashlib
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
 from typing import Optional
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
+from joblib import Parallel, delayed
 from sklearn.decomposition import PCA
 from sklearn.manifold import TSNE
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams["figure.figsize"] = (12, 8)
+# Latent spaces wider than this are PCA-reduced before t-SNE
+TSNE_PCA_COMPONENTS = 50
+
+# Above this many samples "tsne" prefers cuML's GPU t-SNE when installed
+CUML_TSNE_MIN_SAMPLES = 10_000
+
+# .npy cache of t-SNE embeddings
+CACHE_DIR = Path(__file__).resolve().parents[1] / "stage3_outputs" / "cache"
+
+
+@lru_cache(maxsize=None)
+def _ensure_mpl():
+    """
+    Import matplotlib/seaborn on first use and set the plot style.
+    
+    Kept out of module import so callers that only need the embedding
+    helpers don't pay ~0.7s for the plotting stack. The backend is not
+    pinned here: plots without an output_path still go to plt.show().
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    sns.set_style("whitegrid")
+    plt.rcParams["figure.figsize"] = (12, 8)
+    return plt, sns
+
+
+def _save_figure(output_path: str | Path, dpi: int = 150) -> None:
+    """
+    Save the current figure (150 dpi unless the caller asks otherwise).
+    
+    PNGs are written with zlib level 1 instead of the default 6, which
+    trades ~15-30% larger files for a noticeably faster encode.
+    """
+    plt, _ = _ensure_mpl()
+    if Path(output_path).suffix.lower() == ".png":
+        plt.savefig(output_path, dpi=dpi, pil_kwargs={"compress_level": 1})
+    else:
+        plt.savefig(output_path, dpi=dpi)
 
 
 def plot_cluster_distribution(
@@ -36,20 +74,23 @@ def plot_cluster_distribution(
     title : str
         Plot title
     """
+    plt, _ = _ensure_mpl()
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
     # Count plot
     cluster_counts = cluster_labels["cluster_label"].value_counts().sort_index()
+    tick_labels = cluster_counts.index.astype(str).to_numpy()
+    counts = cluster_counts.to_numpy()
     
-    ax1.bar(cluster_counts.index.astype(str), cluster_counts.values, color="steelblue", alpha=0.7)
+    ax1.bar(tick_labels, counts, color="steelblue", alpha=0.7)
     ax1.set_xlabel("Cluster ID")
     ax1.set_ylabel("Number of Meters")
     ax1.set_title(f"{title} - Count")
     ax1.grid(axis="y", alpha=0.3)
     
     # Percentage plot
-    percentages = 100 * cluster_counts / len(cluster_labels)
-    ax2.bar(percentages.index.astype(str), percentages.values, color="coral", alpha=0.7)
+    percentages = counts * (100.0 / len(cluster_labels))
+    ax2.bar(tick_labels, percentages, color="coral", alpha=0.7)
     ax2.set_xlabel("Cluster ID")
     ax2.set_ylabel("Percentage (%)")
     ax2.set_title(f"{title} - Percentage")
@@ -58,7 +99,7 @@ def plot_cluster_distribution(
     plt.tight_layout()
     
     if output_path:
-        plt.savefig(output_path, dpi=150, bbox_inches="tight")
+        _save_figure(output_path)
         print(f"Saved cluster distribution plot to: {output_path}")
     else:
         plt.show()
@@ -66,12 +107,113 @@ def plot_cluster_distribution(
     plt.close()
 
 
+def _opentsne_embedding(latent_vectors: np.ndarray) -> np.ndarray:
+    """
+    Embed latent vectors in 2D with openTSNE (FIt-SNE: FFT-interpolated
+    gradients, approximate nearest neighbours, multi-threaded).
+    
+    openTSNE is an optional dependency and is only imported when used.
+    """
+    try:
+        from openTSNE import TSNE as OpenTSNE
+    except ImportError as exc:
+        raise ImportError(
+            "t-SNE method 'tsne-opentsne' requires the openTSNE package (pip install openTSNE)"
+        ) from exc
+    
+    reducer = OpenTSNE(
+        n_components=2,
+        perplexity=30,
+        negative_gradient_method="fft",
+        neighbors="annoy",
+        n_jobs=-1,
+        random_state=42,
+    )
+    return np.asarray(reducer.fit(np.ascontiguousarray(latent_vectors, dtype=np.float64)))
+
+
+def _cuml_tsne_embedding(latent_vectors: np.ndarray) -> np.ndarray:
+    """
+    Embed latent vectors in 2D with RAPIDS cuML's GPU t-SNE (FFT method).
+    
+    cuML is an optional dependency and is only imported when used.
+    """
+    try:
+        from cuml.manifold import TSNE as CumlTSNE
+    except ImportError as exc:
+        raise ImportError(
+            "t-SNE method 'tsne-cuml' requires RAPIDS cuML and a CUDA GPU"
+        ) from exc
+    
+    reducer = CumlTSNE(
+        n_components=2,
+        perplexity=30,
+        method="fft",
+        random_state=42,
+        output_type="numpy",
+    )
+    return np.asarray(reducer.fit_transform(np.ascontiguousarray(latent_vectors, dtype=np.float32)))
+
+
+def _tsne_embedding(
+    latent_vectors: np.ndarray,
+    method: str,
+    use_cache: bool,
+) -> np.ndarray:
+    """
+    Return the 2D t-SNE embedding of latent vectors.
+    
+    method is "tsne", "tsne-cuml", "tsne-opentsne" or "tsne-sklearn" (see
+    plot_latent_space_2d). With a fixed random_state the embedding only
+    depends on the input and the implementation, so it is cached in
+    CACHE_DIR under a hash of both and re-running the report skips t-SNE.
+    """
+    if method == "tsne":
+        if len(latent_vectors) > CUML_TSNE_MIN_SAMPLES and find_spec("cuml") is not None:
+            method = "tsne-cuml"
+        elif find_spec("openTSNE") is not None:
+            method = "tsne-opentsne"
+        else:
+            method = "tsne-sklearn"
+    
+    cache_path = None
+    if use_cache:
+        digest = hashlib.sha1(repr((latent_vectors.shape, str(latent_vectors.dtype), method)).encode())
+        digest.update(np.ascontiguousarray(latent_vectors).data)
+        cache_path = CACHE_DIR / f"tsne_{digest.hexdigest()[:16]}.npy"
+        if cache_path.exists():
+            return np.load(cache_path)
+    
+    # Wide inputs: PCA first (standard t-SNE preprocessing), which cuts
+    # the neighbour search cost and denoises
+    if latent_vectors.shape[1] > TSNE_PCA_COMPONENTS:
+        latent_vectors = PCA(
+            n_components=TSNE_PCA_COMPONENTS, svd_solver="randomized", random_state=42
+        ).fit_transform(latent_vectors.astype(np.float32, copy=False))
+    
+    if method == "tsne-cuml":
+        reduced = _cuml_tsne_embedding(latent_vectors)
+    elif method == "tsne-opentsne":
+        reduced = _opentsne_embedding(latent_vectors)
+    else:
+        reducer = TSNE(n_components=2, random_state=42, perplexity=30)
+        reduced = reducer.fit_transform(latent_vectors)
+    
+    if cache_path is not None:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        np.save(cache_path, reduced)
+    
+    return reduced
+
+
 def plot_latent_space_2d(
     latent_vectors: np.ndarray,
     cluster_labels: np.ndarray,
     method: str = "pca",
     output_path: str | Path | None = None,
     title: str = "Latent Space Visualization (2D)",
+    use_cache: bool = True,
+    max_points_per_cluster: Optional[int] = 5000,
 ) -> None:
     """
     Visualize latent space in 2D using PCA or t-SNE.
@@ -83,41 +225,71 @@ def plot_latent_space_2d(
     cluster_labels : np.ndarray
         Cluster labels for each sample
     method : str
-        Dimensionality reduction method: "pca" or "tsne"
+        Dimensionality reduction method: "pca", "tsne", "tsne-cuml",
+        "tsne-opentsne" or "tsne-sklearn". "tsne" uses cuML's GPU t-SNE for
+        more than CUML_TSNE_MIN_SAMPLES samples when cuML is installed, else
+        openTSNE (FFT-accelerated) when installed, else scikit-learn's
+        Barnes-Hut t-SNE; the suffixed names force one implementation.
     output_path : str or Path, optional
         Path to save the plot
     title : str
         Plot title
+    use_cache : bool
+        Reuse t-SNE embeddings cached in ``stage3_outputs/cache`` for
+        identical latent vectors. Default: True.
+    max_points_per_cluster : int, optional
+        Plot at most this many points per cluster (a fixed-seed random
+        subset; the projection is still fitted on every point). Beyond a
+        few thousand points a cluster is a saturated blob. None plots all.
     """
+    plt, _ = _ensure_mpl()
     if method == "pca":
         reducer = PCA(n_components=2, random_state=42)
         reduced = reducer.fit_transform(latent_vectors)
         xlabel = f"PC1 ({100*reducer.explained_variance_ratio_[0]:.1f}% variance)"
         ylabel = f"PC2 ({100*reducer.explained_variance_ratio_[1]:.1f}% variance)"
-    elif method == "tsne":
-        reducer = TSNE(n_components=2, random_state=42, perplexity=30)
-        reduced = reducer.fit_transform(latent_vectors)
+    elif method in ("tsne", "tsne-cuml", "tsne-opentsne", "tsne-sklearn"):
+        reduced = _tsne_embedding(latent_vectors, method, use_cache=use_cache)
         xlabel = "t-SNE Component 1"
         ylabel = "t-SNE Component 2"
     else:
-        raise ValueError(f"Unknown method: {method}. Use 'pca' or 'tsne'")
+        raise ValueError(
+            f"Unknown method: {method}. "
+            "Use 'pca', 'tsne', 'tsne-cuml', 'tsne-opentsne' or 'tsne-sklearn'"
+        )
     
     # Create scatter plot
     unique_clusters = np.unique(cluster_labels)
     colors = plt.cm.tab20(np.linspace(0, 1, len(unique_clusters)))
+    legend_labels = np.where(
+        unique_clusters == -1,
+        "Noise",
+        np.char.add("Cluster ", unique_clusters.astype(str)),
+    )
     
     fig, ax = plt.subplots(figsize=(12, 10))
     
-    for i, cluster_id in enumerate(unique_clusters):
-        mask = cluster_labels == cluster_id
-        label = f"Cluster {cluster_id}" if cluster_id != -1 else "Noise"
+    # Group points by cluster with one stable sort; each cluster is then a
+    # contiguous slice, in its original point order
+    order = np.argsort(cluster_labels, kind="stable")
+    sorted_points = reduced[order]
+    bounds = np.searchsorted(cluster_labels[order], unique_clusters)
+    bounds = np.append(bounds, len(order))
+    rng = np.random.default_rng(42)
+    
+    for i in range(len(unique_clusters)):
+        points = sorted_points[bounds[i] : bounds[i + 1]]
+        if max_points_per_cluster is not None and len(points) > max_points_per_cluster:
+            keep = rng.choice(len(points), max_points_per_cluster, replace=False)
+            points = points[np.sort(keep)]
         ax.scatter(
-            reduced[mask, 0],
-            reduced[mask, 1],
-            c=[colors[i]],
-            label=label,
+            points[:, 0],
+            points[:, 1],
+            c=colors[i : i + 1],
+            label=legend_labels[i],
             alpha=0.6,
             s=20,
+            rasterized=True,
         )
     
     ax.set_xlabel(xlabel)
@@ -129,7 +301,7 @@ def plot_latent_space_2d(
     plt.tight_layout()
     
     if output_path:
-        plt.savefig(output_path, dpi=150, bbox_inches="tight")
+        _save_figure(output_path)
         print(f"Saved latent space visualization to: {output_path}")
     else:
         plt.show()
@@ -137,11 +309,30 @@ def plot_latent_space_2d(
     plt.close()
 
 
+def _feature_by_cluster(
+    merged: pd.DataFrame,
+    feature_name: str,
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Split the non-NaN values of a feature per cluster, in cluster order.
+    
+    One stable argsort of the cluster codes replaces a scan of the frame
+    per cluster; each group keeps the original row order.
+    """
+    values = merged[feature_name].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    cluster_ids, codes = np.unique(merged["cluster_label"].to_numpy()[valid], return_inverse=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(1, len(cluster_ids)))
+    return cluster_ids, np.split(values[valid][order], bounds)
+
+
 def plot_cluster_features(
     cluster_labels: pd.DataFrame,
     physical_features: pd.DataFrame,
     feature_name: str,
     output_path: str | Path | None = None,
+    merged: Optional[pd.DataFrame] = None,
 ) -> None:
     """
     Plot distribution of a feature across clusters.
@@ -156,20 +347,62 @@ def plot_cluster_features(
         Name of the feature to plot (e.g., "age", "canya", "diameter")
     output_path : str or Path, optional
         Path to save the plot
+    merged : pd.DataFrame, optional
+        Pre-joined labels and features (inner merge on meter_id); computed
+        from cluster_labels and physical_features when not given.
     """
-    merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
+    plt, sns = _ensure_mpl()
+    if merged is None:
+        merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
+    
+    cluster_ids, groups = _feature_by_cluster(merged, feature_name)
+    positions = np.arange(len(cluster_ids))
+    tick_labels = [str(c) for c in cluster_ids]
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
-    # Box plot
-    sns.boxplot(data=merged, x="cluster_label", y=feature_name, ax=ax1)
+    # Box plot (seaborn's default look: one desaturated colour, dark lines)
+    line_color = ".25"
+    ax1.boxplot(
+        groups,
+        positions=positions,
+        widths=0.8,
+        patch_artist=True,
+        boxprops={"facecolor": sns.desaturate("C0", 0.75), "edgecolor": line_color},
+        medianprops={"color": line_color},
+        whiskerprops={"color": line_color},
+        capprops={"color": line_color},
+        flierprops={"marker": "o", "markerfacecolor": "none", "markeredgecolor": line_color},
+    )
+    ax1.set_xticks(positions, tick_labels)
+    ax1.set_xlim(-0.5, len(cluster_ids) - 0.5)
+    ax1.xaxis.grid(False)
     ax1.set_title(f"{feature_name.capitalize()} Distribution by Cluster")
     ax1.set_xlabel("Cluster ID")
     ax1.set_ylabel(feature_name.capitalize())
     ax1.grid(axis="y", alpha=0.3)
     
-    # Violin plot
-    sns.violinplot(data=merged, x="cluster_label", y=feature_name, ax=ax2)
+    # Violin plot from the same groups; a KDE needs at least two distinct values
+    has_density = [len(g) > 1 and np.ptp(g) > 0 for g in groups]
+    violin = ax2.violinplot(
+        [g for g, ok in zip(groups, has_density) if ok],
+        positions=positions[has_density],
+        widths=0.8,
+        showextrema=False,
+    )
+    for body in violin["bodies"]:
+        body.set_facecolor(sns.desaturate("C0", 0.75))
+        body.set_edgecolor(line_color)
+        body.set_alpha(1)
+    # Inner box as seaborn draws it: quartile bar with a white median mark
+    quartiles = np.array(
+        [np.percentile(g, [25, 50, 75]) if len(g) else [np.nan] * 3 for g in groups]
+    )
+    ax2.vlines(positions, quartiles[:, 0], quartiles[:, 2], color=line_color, linewidth=5)
+    ax2.scatter(positions, quartiles[:, 1], color="white", s=8, zorder=3)
+    ax2.set_xticks(positions, tick_labels)
+    ax2.set_xlim(-0.5, len(cluster_ids) - 0.5)
+    ax2.xaxis.grid(False)
     ax2.set_title(f"{feature_name.capitalize()} Distribution by Cluster (Violin)")
     ax2.set_xlabel("Cluster ID")
     ax2.set_ylabel(feature_name.capitalize())
@@ -178,7 +411,7 @@ def plot_cluster_features(
     plt.tight_layout()
     
     if output_path:
-        plt.savefig(output_path, dpi=150, bbox_inches="tight")
+        _save_figure(output_path)
         print(f"Saved {feature_name} distribution plot to: {output_path}")
     else:
         plt.show()
@@ -191,6 +424,7 @@ def plot_brand_model_distribution(
     physical_features: pd.DataFrame,
     top_n: int = 10,
     output_path: str | Path | None = None,
+    merged: Optional[pd.DataFrame] = None,
 ) -> None:
     """
     Plot brand/model distribution across clusters.
@@ -205,29 +439,44 @@ def plot_brand_model_distribution(
         Number of top brand/models to show
     output_path : str or Path, optional
         Path to save the plot
+    merged : pd.DataFrame, optional
+        Pre-joined labels and features (inner merge on meter_id); computed
+        from cluster_labels and physical_features when not given.
     """
-    merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
+    plt, sns = _ensure_mpl()
+    if merged is None:
+        merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
     
     # Get top N brand/models overall
     top_brand_models = merged["brand_model"].value_counts().head(top_n).index.tolist()
     
-    # Create crosstab
-    crosstab = pd.crosstab(merged["cluster_label"], merged["brand_model"])
-    crosstab = crosstab[top_brand_models]  # Keep only top N
+    # Count table (cluster x brand/model), keeping only the top N
+    crosstab = (
+        merged.groupby(["cluster_label", "brand_model"], observed=True)
+        .size()
+        .unstack(fill_value=0)
+        .reindex(columns=top_brand_models, fill_value=0)
+    )
     
-    # Normalize by cluster size
-    crosstab_pct = crosstab.div(crosstab.sum(axis=1), axis=0) * 100
+    # Normalize by cluster size (over the top N); NaN for clusters with
+    # none of them
+    counts = crosstab.to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = counts / counts.sum(axis=1, keepdims=True) * 100
+    crosstab_pct = pd.DataFrame(pct, index=crosstab.index, columns=crosstab.columns)
     
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 12))
+    # Dense annotated heatmaps: a smaller canvas at 100 dpi keeps the
+    # per-cell text rendering (the bulk of savefig time) in check
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
     
     # Count heatmap
-    sns.heatmap(crosstab, annot=True, fmt="d", cmap="YlOrRd", ax=ax1, cbar_kws={"label": "Count"})
+    sns.heatmap(crosstab, annot=True, fmt="d", annot_kws={"size": 8}, cmap="YlOrRd", ax=ax1, cbar_kws={"label": "Count"})
     ax1.set_title("Brand/Model Distribution by Cluster (Count)")
     ax1.set_xlabel("Brand/Model")
     ax1.set_ylabel("Cluster ID")
     
     # Percentage heatmap
-    sns.heatmap(crosstab_pct, annot=True, fmt=".1f", cmap="YlOrRd", ax=ax2, cbar_kws={"label": "Percentage (%)"})
+    sns.heatmap(crosstab_pct, annot=True, fmt=".1f", annot_kws={"size": 8}, cmap="YlOrRd", ax=ax2, cbar_kws={"label": "Percentage (%)"})
     ax2.set_title("Brand/Model Distribution by Cluster (Percentage)")
     ax2.set_xlabel("Brand/Model")
     ax2.set_ylabel("Cluster ID")
@@ -235,7 +484,7 @@ def plot_brand_model_distribution(
     plt.tight_layout()
     
     if output_path:
-        plt.savefig(output_path, dpi=150, bbox_inches="tight")
+        _save_figure(output_path, dpi=100)
         print(f"Saved brand/model distribution plot to: {output_path}")
     else:
         plt.show()
@@ -260,45 +509,63 @@ def plot_subcounting_risk(
     top_n : int
         Number of top clusters to show
     """
-    top_risky = subcounting_risk_df.head(top_n)
+    plt, _ = _ensure_mpl()
+    # One float block for the plotted columns instead of a pandas->numpy
+    # conversion per column per subplot
+    (
+        cluster_id,
+        risk_score,
+        avg_age,
+        avg_canya,
+        n_meters,
+        pct_high_age,
+        pct_low_canya,
+    ) = (
+        subcounting_risk_df[
+            ["cluster_id", "risk_score", "avg_age", "avg_canya", "n_meters", "pct_high_age", "pct_low_canya"]
+        ]
+        .head(top_n)
+        .to_numpy(dtype=np.float64)
+        .T
+    )
+    positions = np.arange(len(cluster_id))
+    cluster_names = [f"Cluster {int(c)}" for c in cluster_id]
     
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig, axes = plt.subplots(2, 2, figsize=(12, 9))
     
     # Risk score bar plot
-    axes[0, 0].barh(range(len(top_risky)), top_risky["risk_score"].values, color="crimson", alpha=0.7)
-    axes[0, 0].set_yticks(range(len(top_risky)))
-    axes[0, 0].set_yticklabels([f"Cluster {int(c)}" for c in top_risky["cluster_id"]])
+    axes[0, 0].barh(positions, risk_score, color="crimson", alpha=0.7)
+    axes[0, 0].set_yticks(positions)
+    axes[0, 0].set_yticklabels(cluster_names)
     axes[0, 0].set_xlabel("Risk Score")
     axes[0, 0].set_title("Subcounting Risk Score (Top Clusters)")
     axes[0, 0].grid(axis="x", alpha=0.3)
     axes[0, 0].invert_yaxis()
     
     # Age vs Canya scatter
-    axes[0, 1].scatter(top_risky["avg_age"], top_risky["avg_canya"], 
-                       s=top_risky["n_meters"]*2, alpha=0.6, c=top_risky["risk_score"], 
+    axes[0, 1].scatter(avg_age, avg_canya, 
+                       s=n_meters*2, alpha=0.6, c=risk_score, 
                        cmap="Reds", edgecolors="black")
     axes[0, 1].set_xlabel("Average Age (years)")
     axes[0, 1].set_ylabel("Average Canya")
     axes[0, 1].set_title("Age vs Canya (Size = # Meters, Color = Risk)")
     axes[0, 1].grid(alpha=0.3)
-    for _, row in top_risky.iterrows():
-        axes[0, 1].annotate(f"C{int(row['cluster_id'])}", 
-                           (row["avg_age"], row["avg_canya"]),
-                           fontsize=8)
+    for cid, age, canya in zip(cluster_id, avg_age, avg_canya):
+        axes[0, 1].annotate(f"C{int(cid)}", (age, canya), fontsize=8)
     
     # Percentage high age
-    axes[1, 0].barh(range(len(top_risky)), top_risky["pct_high_age"].values, color="orange", alpha=0.7)
-    axes[1, 0].set_yticks(range(len(top_risky)))
-    axes[1, 0].set_yticklabels([f"Cluster {int(c)}" for c in top_risky["cluster_id"]])
+    axes[1, 0].barh(positions, pct_high_age, color="orange", alpha=0.7)
+    axes[1, 0].set_yticks(positions)
+    axes[1, 0].set_yticklabels(cluster_names)
     axes[1, 0].set_xlabel("Percentage (%)")
     axes[1, 0].set_title("Percentage of Meters with High Age")
     axes[1, 0].grid(axis="x", alpha=0.3)
     axes[1, 0].invert_yaxis()
     
     # Percentage low canya
-    axes[1, 1].barh(range(len(top_risky)), top_risky["pct_low_canya"].values, color="purple", alpha=0.7)
-    axes[1, 1].set_yticks(range(len(top_risky)))
-    axes[1, 1].set_yticklabels([f"Cluster {int(c)}" for c in top_risky["cluster_id"]])
+    axes[1, 1].barh(positions, pct_low_canya, color="purple", alpha=0.7)
+    axes[1, 1].set_yticks(positions)
+    axes[1, 1].set_yticklabels(cluster_names)
     axes[1, 1].set_xlabel("Percentage (%)")
     axes[1, 1].set_title("Percentage of Meters with Low Canya")
     axes[1, 1].grid(axis="x", alpha=0.3)
@@ -307,7 +574,7 @@ def plot_subcounting_risk(
     plt.tight_layout()
     
     if output_path:
-        plt.savefig(output_path, dpi=150, bbox_inches="tight")
+        _save_figure(output_path, dpi=100)
         print(f"Saved subcounting risk plot to: {output_path}")
     else:
         plt.show()
@@ -315,16 +582,36 @@ def plot_subcounting_risk(
     plt.close()
 
 
+def _render_headless(plot_func, *args, **kwargs) -> None:
+    """
+    Run a plot function on the Agg backend (used in report workers).
+    
+    The previous backend is restored afterwards: with n_jobs=1 joblib runs
+    the tasks in the calling process, which may be a notebook.
+    """
+    plt, _ = _ensure_mpl()
+    previous = plt.get_backend()
+    plt.switch_backend("Agg")
+    try:
+        plot_func(*args, **kwargs)
+    finally:
+        plt.switch_backend(previous)
+
+
 def create_comprehensive_visualization_report(
     cluster_labels: pd.DataFrame,
     latent_vectors: np.ndarray,
     physical_features: pd.DataFrame,
     subcounting_risk_df: pd.DataFrame,
     output_dir: str | Path,
+    n_jobs: int = -1,
 ) -> None:
     """
     Create a comprehensive visualization report for Stage 3.
     
+    The plots are independent, so they are rendered in parallel worker
+    processes (matplotlib state is per process).
+    
     Parameters
     ----------
     cluster_labels : pd.DataFrame
@@ -337,58 +624,80 @@ def create_comprehensive_visualization_report(
         DataFrame with subcounting risk analysis
     output_dir : str or Path
         Directory to save all plots
+    n_jobs : int
+        Number of worker processes (joblib convention: -1 uses all cores,
+        1 renders sequentially in this process).
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     
     print("\nGenerating visualization report...")
     
-    # 1. Cluster distribution
-    plot_cluster_distribution(
-        cluster_labels,
-        output_path=output_dir / "cluster_distribution.png",
-    )
-    
-    # 2. Latent space visualization (PCA)
-    cluster_labels_array = cluster_labels["cluster_label"].values
-    plot_latent_space_2d(
-        latent_vectors,
-        cluster_labels_array,
-        method="pca",
-        output_path=output_dir / "latent_space_pca.png",
-    )
-    
-    # 3. Latent space visualization (t-SNE)
-    plot_latent_space_2d(
-        latent_vectors,
-        cluster_labels_array,
-        method="tsne",
-        output_path=output_dir / "latent_space_tsne.png",
-    )
-    
-    # 4. Feature distributions
+    cluster_labels_array = cluster_labels["cluster_label"].to_numpy()
+    # Labels joined with physical features once, shared by the feature
+    # and brand/model plots
+    merged = cluster_labels.merge(physical_features, on="meter_id", how="inner")
+    tasks = [
+        # Latent space visualization (t-SNE) first: by far the longest
+        delayed(_render_headless)(
+            plot_latent_space_2d,
+            latent_vectors,
+            cluster_labels_array,
+            method="tsne",
+            output_path=output_dir / "latent_space_tsne.png",
+        ),
+        # Cluster distribution
+        delayed(_render_headless)(
+            plot_cluster_distribution,
+            cluster_labels,
+            output_path=output_dir / "cluster_distribution.png",
+        ),
+        # Latent space visualization (PCA)
+        delayed(_render_headless)(
+            plot_latent_space_2d,
+            latent_vectors,
+            cluster_labels_array,
+            method="pca",
+            output_path=output_dir / "latent_space_pca.png",
+        ),
+    ]
+    
+    # Feature distributions
     for feature in ["age", "canya", "diameter"]:
         if feature in physical_features.columns:
-            plot_cluster_features(
-                cluster_labels,
-                physical_features,
-                feature,
-                output_path=output_dir / f"{feature}_distribution.png",
+            tasks.append(
+                delayed(_render_headless)(
+                    plot_cluster_features,
+                    cluster_labels,
+                    physical_features,
+                    feature,
+                    output_path=output_dir / f"{feature}_distribution.png",
+                    merged=merged,
+                )
             )
     
-    # 5. Brand/model distribution
-    plot_brand_model_distribution(
-        cluster_labels,
-        physical_features,
-        output_path=output_dir / "brand_model_distribution.png",
+    # Brand/model distribution
+    tasks.append(
+        delayed(_render_headless)(
+            plot_brand_model_distribution,
+            cluster_labels,
+            physical_features,
+            output_path=output_dir / "brand_model_distribution.png",
+            merged=merged,
+        )
     )
     
-    # 6. Subcounting risk
-    plot_subcounting_risk(
-        subcounting_risk_df,
-        output_path=output_dir / "subcounting_risk.png",
+    # Subcounting risk
+    tasks.append(
+        delayed(_render_headless)(
+            plot_subcounting_risk,
+            subcounting_risk_df,
+            output_path=output_dir / "subcounting_risk.png",
+        )
     )
     
+    Parallel(n_jobs=n_jobs)(tasks)
+    
     print(f"\n  ✓ All visualizations saved to: {output_dir}")
 
 
@@ -397,10 +706,15 @@ def main():
     Main function to generate all visualizations for Stage 3.
     Loads data from stage outputs and generates comprehensive visualization report.
     """
+    plt, _ = _ensure_mpl()
     import argparse
     import sys
     from pathlib import Path
     
+    # The report always writes to disk: render headless, without probing
+    # for a GUI toolkit (plot functions called directly keep plt.show())
+    plt.switch_backend("Agg")
+    
     # Add parent directory to path for imports
     sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
     
@@ -496,13 +810,22 @@ def main():
     # Load latent representations
     print("\nLoading latent representations...")
     print(f"  Looking for: {args.latent_representations}")
-    if not args.latent_representations.exists():
+    # Prefer the Parquet copy Stage 2 writes next to the CSV unless the CSV
+    # is newer (same rule as stage3_clustering.load_latent_representations)
+    latent_parquet = args.latent_representations.with_suffix(".parquet")
+    if latent_parquet.exists() and (
+        not args.latent_representations.exists()
+        or latent_parquet.stat().st_mtime >= args.latent_representations.stat().st_mtime
+    ):
+        latent_df = pd.read_parquet(latent_parquet)
+    elif not args.latent_representations.exists():
         print(f"Error: Latent representations file not found: {args.latent_representations}")
         print(f"  Absolute path: {args.latent_representations.resolve()}")
         return
-    latent_df = pd.read_csv(args.latent_representations)
+    else:
+        latent_df = pd.read_csv(args.latent_representations, engine="pyarrow")
     latent_cols = [col for col in latent_df.columns if col.startswith("z_")]
-    latent_vectors = latent_df[latent_cols].values
+    latent_vectors = latent_df[latent_cols].to_numpy()
     print(f"  ✓ Loaded {len(latent_df):,} latent vectors with {len(latent_cols)} dimensions")
     
     # Load physical features from database